@@ -0,0 +1,198 @@
+import os
+import sys
+from math import cos, floor, radians, sqrt
+
+from Tag_Tracking_Check.multi_device import load_track
+from Tag_Tracking_Check.route_stops import parse_path_txt, short_place
+
+import profiling
+
+R = 6371e3
+DEFAULT_CELL = 200.0   # 격자 한 칸 크기 (m)
+PERCENTILES = (50, 90, 95, 99)
+
+
+def polyline_from_stops(entries):
+    # 이동경로.txt의 순서대로 장소를 이은 계획 경로
+    coords = [(e["lat"], e["lon"]) for e in entries]
+    labels = [
+        f"{short_place(a['place'])} → {short_place(b['place'])}"
+        for a, b in zip(entries, entries[1:])
+    ]
+    return coords, labels
+
+
+def polyline_from_kml(path):
+    # show_kml_path와 같은 'course' 폴더의 LineString
+    import show_kml_path
+
+    coords = [(lat, lon) for lat, lon in show_kml_path.parse_kml(path)]
+    labels = [f"segment {i}" for i in range(1, len(coords))]
+    return coords, labels
+
+
+def _ring_cells(cx, cy, ring):
+    # (cx, cy)에서 체비쇼프 거리가 정확히 ring인 격자 칸
+    if ring == 0:
+        yield cx, cy
+        return
+    for gx in range(cx - ring, cx + ring + 1):
+        yield gx, cy - ring
+        yield gx, cy + ring
+    for gy in range(cy - ring + 1, cy + ring):
+        yield cx - ring, gy
+        yield cx + ring, gy
+
+
+class SegmentGrid:
+    """Uniform grid over the segments of a polyline.
+
+    Coordinates are projected to a local equirectangular plane in meters.
+    Each segment is registered in every cell its bounding box touches, and a
+    query searches rings of cells outward from the point until no unsearched
+    segment can be closer than the best one found.
+    """
+
+    def __init__(self, coords, cell=DEFAULT_CELL):
+        if len(coords) < 2:
+            raise ValueError("경로에는 최소 2개의 점이 필요합니다")
+        self.lat0 = sum(lat for lat, _ in coords) / len(coords)
+        self.lon0 = sum(lon for _, lon in coords) / len(coords)
+        self._kx = radians(1) * R * cos(radians(self.lat0))
+        self._ky = radians(1) * R
+        self.cell = cell
+        pts = [self.project(lat, lon) for lat, lon in coords]
+        self.segments = list(zip(pts, pts[1:]))
+        self.cells = {}
+        for i, ((x1, y1), (x2, y2)) in enumerate(self.segments):
+            for cx in range(self._ci(min(x1, x2)), self._ci(max(x1, x2)) + 1):
+                for cy in range(self._ci(min(y1, y2)), self._ci(max(y1, y2)) + 1):
+                    self.cells.setdefault((cx, cy), []).append(i)
+        xs = [c[0] for c in self.cells]
+        ys = [c[1] for c in self.cells]
+        self._bounds = (min(xs), max(xs), min(ys), max(ys))
+
+    def _ci(self, v):
+        return floor(v / self.cell)
+
+    def project(self, lat, lon):
+        return (lon - self.lon0) * self._kx, (lat - self.lat0) * self._ky
+
+    def _segment_distance(self, i, x, y):
+        (x1, y1), (x2, y2) = self.segments[i]
+        dx = x2 - x1
+        dy = y2 - y1
+        length2 = dx * dx + dy * dy
+        t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length2))
+        px = x1 + t * dx - x
+        py = y1 + t * dy - y
+        return sqrt(px * px + py * py)
+
+    def nearest(self, lat, lon):
+        """Return ``(distance_m, segment_index)`` of the closest segment."""
+        x, y = self.project(lat, lon)
+        cx, cy = self._ci(x), self._ci(y)
+        min_x, max_x, min_y, max_y = self._bounds
+        # 격자 전체를 덮는 데 필요한 최대 ring
+        max_ring = max(abs(cx - min_x), abs(cx - max_x), abs(cy - min_y), abs(cy - max_y))
+        best = (float("inf"), -1)
+        seen = set()
+        evaluations = 0
+        for ring in range(max_ring + 1):
+            for key in _ring_cells(cx, cy, ring):
+                for i in self.cells.get(key, ()):
+                    if i in seen:
+                        continue
+                    seen.add(i)
+                    evaluations += 1
+                    d = self._segment_distance(i, x, y)
+                    if d < best[0]:
+                        best = (d, i)
+            # ring까지 검사했으면 나머지 선분은 최소 ring * cell 이상 떨어져 있다
+            if best[0] <= ring * self.cell:
+                break
+        profiling.count("segment_evaluations", evaluations)
+        return best
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+@profiling.profiled("cross_track_errors")
+def cross_track_errors(grid, positions):
+    """Per-fix cross-track error: list of ``(dt, lat, lon, xte_m, segment_index)``."""
+    out = []
+    for dt, lat, lon in positions:
+        d, seg = grid.nearest(lat, lon)
+        out.append((dt, lat, lon, d, seg))
+    return out
+
+
+def summarize_errors(errors, labels, top=5):
+    values = sorted(e[3] for e in errors)
+    summary = {f"p{q}": percentile(values, q) for q in PERCENTILES}
+    summary["max"] = values[-1] if values else None
+    summary["mean"] = sum(values) / len(values) if values else None
+    summary["count"] = len(values)
+
+    per_segment = {}
+    for _, _, _, d, seg in errors:
+        stat = per_segment.setdefault(seg, [0, 0.0, 0.0])
+        stat[0] += 1
+        stat[1] += d
+        stat[2] = max(stat[2], d)
+    worst = sorted(per_segment.items(), key=lambda kv: kv[1][2], reverse=True)[:top]
+    summary["worst_segments"] = [
+        {
+            "segment": seg,
+            "label": labels[seg] if 0 <= seg < len(labels) else "",
+            "fixes": n,
+            "mean": total / n,
+            "max": mx,
+        }
+        for seg, (n, total, mx) in worst
+    ]
+    return summary
+
+
+def load_polyline(path):
+    if path.lower().endswith(".kml"):
+        return polyline_from_kml(path)
+    return polyline_from_stops(parse_path_txt(path))
+
+
+def main():
+    profiling.enable_from_argv()
+    args = sys.argv[1:]
+    top = 5
+    if "--top" in args:
+        i = args.index("--top")
+        top = int(args[i + 1])
+        del args[i:i + 2]
+    if len(args) < 2:
+        print("사용법: python -m mde route xte <이동경로.txt|course.kml> <track.kml|TRACKING.txt> [--top N]")
+        return
+
+    coords, labels = load_polyline(args[0])
+    grid = SegmentGrid(coords)
+    errors = cross_track_errors(grid, load_track(args[1]))
+    summary = summarize_errors(errors, labels, top)
+
+    print(f"{os.path.basename(args[1])}: {summary['count']} fixes")
+    if not summary["count"]:
+        return
+    stats = "  ".join(f"p{q} {summary[f'p{q}']:.1f}" for q in PERCENTILES)
+    print(f"  {stats}  max {summary['max']:.1f}  mean {summary['mean']:.1f} (m)")
+    print("  worst segments:")
+    for w in summary["worst_segments"]:
+        print(f"    [{w['segment'] + 1}] {w['label']}: max {w['max']:.1f} m, mean {w['mean']:.1f} m, {w['fixes']} fixes")
+
+
+if __name__ == "__main__":
+    main()
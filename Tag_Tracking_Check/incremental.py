@@ -0,0 +1,91 @@
+from bisect import insort
+
+from Tag_Tracking_Check.list_kml_positions import KmlTail
+from Tag_Tracking_Check.multi_device import StopIndex
+from Tag_Tracking_Check.route_stops import summarize_stops
+
+import profiling
+
+
+class IncrementalTrack:
+    """Track and stop groups of a file that keeps growing during a drive.
+
+    ``refresh()`` parses only the tail appended since the previous call
+    (``KmlTail`` / ``TrackingTail``), groups just the new points against the
+    stop index and re-summarizes only the stops that received points.
+    TRACKING logs go through a ``TrajectoryCleaner`` whose state is kept
+    across refreshes.
+    """
+
+    def __init__(self, entries, path, radius=300):
+        self.entries = entries
+        self.path = path
+        self.index = StopIndex(entries, radius)
+        self._order = {e["place"]: i for i, e in enumerate(entries, 1)}
+        self._is_kml = path.lower().endswith(".kml")
+        self.was_reset = False
+        if self._is_kml:
+            self._tail = KmlTail(path)
+        else:
+            from tracking_log import TrackingTail
+
+            self._tail = TrackingTail(path)
+        self._clear()
+
+    def _clear(self):
+        self.positions = []
+        self.groups = {e["place"]: [] for e in self.entries}
+        self.rows = {}
+        if not self._is_kml:
+            from trajectory_clean import TrajectoryCleaner
+
+            self._cleaner = TrajectoryCleaner()
+
+    def _new_positions(self, items):
+        if self._is_kml:
+            return items
+        from trajectory_clean import fixes_to_columns, to_positions
+
+        return to_positions(self._cleaner.feed(fixes_to_columns(items)))
+
+    @profiling.profiled("incremental_refresh")
+    def refresh(self):
+        """Read appended data; return the set of places whose summary changed.
+
+        When the file was replaced everything is rebuilt, ``was_reset`` is set
+        and all places are returned.
+        """
+        items, reset = self._tail.read_new()
+        self.was_reset = reset
+        if reset:
+            self._clear()
+        new = self._new_positions(items)
+        if not new:
+            return set(self.groups) if reset else set()
+
+        for pos in new:
+            insort(self.positions, pos)
+        changed = set()
+        for place, points in self.index.group(new).items():
+            if not points:
+                continue
+            group = self.groups[place]
+            for pos in points:
+                insort(group, pos)
+            changed.add(place)
+
+        for place in changed:
+            entry = self.entries[self._order[place] - 1]
+            rows = summarize_stops([entry], {place: self.groups[place]})
+            if rows:
+                rows[0]["order"] = self._order[place]
+                self.rows[place] = rows[0]
+        return set(self.groups) if reset else changed
+
+    @property
+    def parse_errors(self):
+        # KML Placemark 중 파싱하지 못해 건너뛴 수 (TRACKING 로그는 0)
+        return getattr(self._tail, "errors", 0)
+
+    def summary(self):
+        return sorted(self.rows.values(), key=lambda row: row["arrive"])
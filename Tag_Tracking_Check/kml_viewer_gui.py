@@ -1,59 +1,12 @@
-import csv
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from math import radians, cos, sin, asin, sqrt
-
-from list_kml_positions import parse_kml
-
-# 거리 계산을 위한 haversine 함수 (단위: 미터)
-def haversine(lon1, lat1, lon2, lat2):
-    R = 6371e3
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-    c = 2 * asin(sqrt(a))
-    return R * c
-
-# 이동경로.txt 파싱
-def parse_path_txt(path):
-    entries = []
-    with open(path, encoding="utf-8") as f:
-        reader = csv.reader(f)
-        next(reader, None)  # 헤더 건너뜀
-        for row in reader:
-            # 최소 6개 컬럼(순서, 장소, 경도, 위도, 도착알림, 출발알림)이 있어야 함
-            if len(row) < 6:
-                continue
-            place = row[1]
-            lon = float(row[2])
-            lat = float(row[3])
-            arrive_alert = row[4].replace(".", ":").strip()
-            depart_alert = row[5].replace(".", ":").strip()
-            entries.append({
-                "place": place,
-                "lon": lon,
-                "lat": lat,
-                "arrive_alert": arrive_alert,
-                "depart_alert": depart_alert,
-            })
-    return entries
-
-# KML 위치 정보를 장소 기준으로 그룹화
-def group_positions(entries, kml_positions, radius=300):
-    groups = {e["place"]: [] for e in entries}
-    for dt, lat, lon in kml_positions:
-        for e in entries:
-            dist = haversine(lon, lat, e["lon"], e["lat"])
-            if dist <= radius:
-                groups[e["place"]].append((dt, lat, lon))
-    return groups
-
-# 장소 이름만 추출 (주소 부분 제거)
-def short_place(name: str) -> str:
-    if "(" in name:
-        return name.split("(")[0].strip()
-    return name.strip()
+
+from Tag_Tracking_Check.route_stops import parse_path_txt, short_place
+from Tag_Tracking_Check.incremental import IncrementalTrack
+from Tag_Tracking_Check import multi_device
+
+import profiling
+
 
 class RealRouteGUI(tk.Tk):
     def __init__(self):
@@ -76,7 +29,10 @@ class RealRouteGUI(tk.Tk):
         ttk.Button(top, text="Tracking.kml", command=self.select_kml).grid(row=1, column=0, padx=5)
         ttk.Entry(top, textvariable=self.kml_var, width=60).grid(row=1, column=1, padx=5)
 
-        ttk.Button(top, text="불러오기", command=self.load).grid(row=2, column=0, columnspan=2, pady=5)
+        btn_frame = ttk.Frame(top)
+        btn_frame.grid(row=2, column=0, columnspan=2, pady=5)
+        ttk.Button(btn_frame, text="불러오기", command=self.load).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="다중 기기 비교", command=self.compare_devices).pack(side=tk.LEFT)
 
         body = ttk.Frame(self)
         body.pack(fill=tk.BOTH, expand=True)
@@ -139,10 +95,29 @@ class RealRouteGUI(tk.Tk):
             self.txt_var.set(path)
 
     def select_kml(self):
-        path = filedialog.askopenfilename(filetypes=[("KML", "*.kml")])
+        path = filedialog.askopenfilename(filetypes=[("KML", "*.kml"), ("TRACKING", "*.txt")])
         if path:
             self.kml_var.set(path)
 
+    def compare_devices(self):
+        txt = self.txt_var.get()
+        if not txt:
+            messagebox.showerror("오류", "이동경로.txt 파일을 선택하세요")
+            return
+        paths = filedialog.askopenfilenames(
+            filetypes=[("KML / TRACKING", "*.kml *.txt"), ("KML", "*.kml"), ("Text", "*.txt")]
+        )
+        if not paths:
+            return
+        try:
+            entries = parse_path_txt(txt)
+            with profiling.span("compare_devices"):
+                results = multi_device.compare_devices(entries, list(paths))
+        except Exception as e:
+            messagebox.showerror("오류", str(e))
+            return
+        DeviceMatrixWindow(self, entries, results)
+
     def load(self):
         txt = self.txt_var.get()
         kml = self.kml_var.get()
@@ -150,66 +125,95 @@ class RealRouteGUI(tk.Tk):
             messagebox.showerror("오류", "파일을 선택하세요")
             return
 
+        with profiling.span("load"):
+            self._load(txt, kml)
+
+    def _load(self, txt, kml):
+        # 같은 파일을 다시 불러오면 그 사이에 추가된 부분만 읽는다
+        tracker = getattr(self, "tracker", None)
+        full = tracker is None or tracker.path != kml or self.txt_path != txt
         try:
-            entries = parse_path_txt(txt)
-            kml_positions = parse_kml(kml)
+            if full:
+                tracker = IncrementalTrack(parse_path_txt(txt), kml)
+            changed = tracker.refresh()
         except Exception as e:
+            self.tracker = None
             messagebox.showerror("오류", str(e))
             return
 
-        groups = group_positions(entries, kml_positions)
-        self.entries = entries
-        self.groups = groups
-
-        for item in self.tree_summary.get_children():
-            self.tree_summary.delete(item)
-        for item in self.tree_detail.get_children():
-            self.tree_detail.delete(item)
+        reported = 0 if full else getattr(self, "_reported_errors", 0)
+        if tracker.parse_errors and tracker.parse_errors != reported:
+            messagebox.showwarning("경고", f"파싱하지 못한 Placemark {tracker.parse_errors}개를 건너뛰었습니다")
+        self._reported_errors = tracker.parse_errors
+        self.tracker = tracker
+        self.txt_path = txt
+        self.entries = tracker.entries
+        self.groups = tracker.groups
+
+        # 파일이 교체되었으면 아직 도달하지 않은 장소의 이전 행도 지운다
+        if full or tracker.was_reset:
+            for item in self.tree_summary.get_children():
+                self.tree_summary.delete(item)
+            for item in self.tree_detail.get_children():
+                self.tree_detail.delete(item)
 
         # 상세 정보는 요약 선택 시 표시하므로 초기에는 출력하지 않음
 
-        # 요약 정보 출력
-        summary_rows = []
-        for e in entries:
-            place = e["place"]
-            rows = groups.get(place, [])
-            if rows:
-                arrive_dt = rows[0][0]
-                depart_dt = rows[-1][0]
-                arrive_str = arrive_dt.strftime("%H:%M:%S")
-                depart_str = depart_dt.strftime("%H:%M:%S")
-                alert_str = e.get("arrive_alert", "")
-
-                diff_display = ""
-                result = ""
-                if alert_str and alert_str != "-":
-                    try:
-                        h, m = map(int, alert_str.split(":")[:4])
-                        alert_dt = arrive_dt.replace(hour=h, minute=m, second=0, microsecond=0)
-                        arrive_floor = arrive_dt.replace(second=0, microsecond=0)
-                        diff_min = (alert_dt - arrive_floor).total_seconds() / 60
-
-                        diff_display = f"{diff_min:.1f}"
-                        result = "Pass" if 0 <= diff_min <= 2 else "Fail"
-                    except ValueError:
-                        result = "Fail"
-                else:
-                    result = "Fail"
-                    
-                summary_rows.append((arrive_dt, place, short_place(place), arrive_str, depart_str, alert_str, diff_display, result))
-
-        summary_rows.sort(key=lambda x: x[0])
-        for _, full, short, a, d, alert, diff, res in summary_rows:
-            tag = "pass" if res == "Pass" else "fail"
-            self.tree_summary.insert(
-                "",
-                tk.END,
-                iid=full,
-                values=[short, a, d, alert, diff, res],
-                tags=(tag,),
-            )
+        # 요약 정보 출력 (바뀐 장소만 갱신)
+        with profiling.span("treeview_insert"):
+            self._update_summary(tracker.summary(), changed)
+
+    def _update_summary(self, summary_rows, changed):
+        for index, row in enumerate(summary_rows):
+            place = row["place"]
+            if place not in changed:
+                continue
+            tag = "pass" if row["result"] == "Pass" else "fail"
+            values = [
+                short_place(place),
+                row["arrive"].strftime("%H:%M:%S"),
+                row["depart"].strftime("%H:%M:%S"),
+                row["alert"],
+                row["diff"],
+                row["result"],
+            ]
+            if self.tree_summary.exists(place):
+                self.tree_summary.item(place, values=values, tags=(tag,))
+                self.tree_summary.move(place, "", index)
+            else:
+                self.tree_summary.insert("", index, iid=place, values=values, tags=(tag,))
+
+class DeviceMatrixWindow(tk.Toplevel):
+    # 기기 x 장소 도착 지연(분)/Pass-Fail 표
+    def __init__(self, master, entries, results):
+        super().__init__(master)
+        self.title("다중 기기 비교")
+        self.geometry("1400x400")
+
+        header, rows = multi_device.delay_matrix(entries, results)
+        counts = multi_device.pass_counts(results)
+        columns = [f"c{i}" for i in range(len(header) + 1)]
+        tree = ttk.Treeview(self, columns=columns, show="headings")
+        for col, title in zip(columns, header + ["Pass"]):
+            tree.heading(col, text=title)
+            tree.column(col, width=110, anchor=tk.CENTER)
+        tree.column(columns[0], width=180, anchor=tk.W)
+        tree.tag_configure("pass", background="#d8f6d8")  # light green
+        tree.tag_configure("fail", background="#f6d8d8")  # light red
+
+        for cells in rows:
+            name = cells[0]
+            tag = "pass" if counts[name] == len(entries) else "fail"
+            tree.insert("", tk.END, values=cells + [f"{counts[name]}/{len(entries)}"], tags=(tag,))
+
+        xscroll = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=tree.xview)
+        tree.configure(xscrollcommand=xscroll.set)
+        tree.pack(fill=tk.BOTH, expand=True)
+        xscroll.pack(fill=tk.X)
+
 
 def main():
+    profiling.enable_from_argv()
     app = RealRouteGUI()
     app.mainloop()
 
@@ -1,8 +1,12 @@
+import os
 import sys
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta, timezone
 
+import profiling
+
 KST = timezone(timedelta(hours=9))
+MARK_BYTES = 256  # KmlTail이 파일 교체 판별에 쓰는 offset 앞 바이트 수
 
 # Namespace definitions for parsing KML
 NS = {
@@ -10,36 +14,165 @@ NS = {
 }
 
 
-def parse_kml(file_path):
-    tree = ET.parse(file_path)
-    root = tree.getroot()
+def placemark_position(placemark):
+    when_elem = placemark.find('.//kml:TimeStamp/kml:when', NS)
+    coord_elem = placemark.find('.//kml:Point/kml:coordinates', NS)
 
-    positions = []
-    for placemark in root.findall('.//kml:Placemark', NS):
-        when_elem = placemark.find('.//kml:TimeStamp/kml:when', NS)
-        coord_elem = placemark.find('.//kml:Point/kml:coordinates', NS)
+    if when_elem is None or coord_elem is None:
+        return None
 
-        if when_elem is None or coord_elem is None:
-            continue
+    try:
+        dt_utc = datetime.fromisoformat(when_elem.text.replace('Z', '+00:00'))
+    except ValueError:
+        # Skip invalid timestamp format
+        return None
+
+    dt_kst = dt_utc.astimezone(KST)
+    coord_text = coord_elem.text.strip()
+    lon, lat = map(float, coord_text.split(',')[:2])
+    return dt_kst, lat, lon
 
-        try:
-            dt_utc = datetime.fromisoformat(when_elem.text.replace('Z', '+00:00'))
-        except ValueError:
-            # Skip invalid timestamp format
-            continue
 
-        dt_kst = dt_utc.astimezone(KST)
-        coord_text = coord_elem.text.strip()
-        lon, lat = map(float, coord_text.split(',')[:2])
-        positions.append((dt_kst, lat, lon))
+def positions_from_root(root, position=placemark_position):
+    positions = []
+    placemarks = root.findall('.//kml:Placemark', NS)
+    profiling.count('kml.placemarks', len(placemarks))
+    for placemark in placemarks:
+        pos = position(placemark)
+        if pos is not None:
+            positions.append(pos)
 
     positions.sort(key=lambda x: x[0])
     return positions
 
 
+@profiling.profiled('parse_kml')
+def parse_kml(file_path):
+    with profiling.span('xml_parse'):
+        tree = ET.parse(file_path)
+    return positions_from_root(tree.getroot())
+
+
+# 기록 중인 KML은 닫는 태그가 없어 전체 파싱이 안 되므로 Placemark 단위로 읽는다
+_PLACEMARK_START = b'<Placemark'
+_PLACEMARK_END = b'</Placemark>'
+_ROOT_START = b'<kml'
+_WRAP_START = (b'<kml xmlns="http://www.opengis.net/kml/2.2" '
+               b'xmlns:gx="http://www.google.com/kml/ext/2.2">')
+_WRAP_END = b'</kml>'
+
+
+def _root_start_tag(data):
+    # 파일의 실제 <kml ...> 시작 태그 (atom:, xsi: 등 선언된 접두어를 그대로 쓰기 위해)
+    start = data.find(_ROOT_START)
+    while start >= 0 and data[start + len(_ROOT_START):start + len(_ROOT_START) + 1] not in (b' ', b'\t', b'\r', b'\n', b'>'):
+        start = data.find(_ROOT_START, start + 1)
+    if start < 0:
+        return None
+    stop = data.find(b'>', start)
+    if stop < 0 or data[stop - 1:stop] == b'/':
+        return None
+    return data[start:stop + 1]
+
+
+class KmlTail:
+    """Parse only the placemarks appended to a KML file since the last read.
+
+    The byte offset after the last complete ``</Placemark>`` is remembered, so
+    each ``read_new()`` costs time proportional to the new data. ``reset`` is
+    True when the file was replaced and was read again from the start: it
+    shrank, its inode changed, or the bytes just before the offset differ.
+
+    A file that is already complete (ends with ``</kml>``) on the first read
+    is parsed as one document, like ``parse_kml``. Otherwise each placemark
+    is parsed inside the file's own ``<kml ...>`` start tag, so prefixes
+    declared there still resolve. Placemarks that fail to parse are counted
+    in ``errors``. ``position`` turns a placemark element into
+    ``(dt, lat, lon)`` or None.
+    """
+
+    def __init__(self, file_path, position=placemark_position):
+        self.path = file_path
+        self.position = position
+        self.offset = 0
+        self.count = 0
+        self.errors = 0
+        self._ino = None
+        self._mark = b''
+        self._wrap_start = _WRAP_START
+
+    def _replaced(self, f):
+        st = os.fstat(f.fileno())
+        if st.st_size < self.offset or st.st_ino != self._ino:
+            return True
+        f.seek(self.offset - len(self._mark))
+        return f.read(len(self._mark)) != self._mark
+
+    def read_new(self):
+        with open(self.path, 'rb') as f:
+            reset = self.offset > 0 and self._replaced(f)
+            if reset:
+                self.offset = 0
+                self.count = 0
+                self.errors = 0
+                self._mark = b''
+            self._ino = os.fstat(f.fileno()).st_ino
+            f.seek(self.offset)
+            data = f.read()
+        end = data.rfind(_PLACEMARK_END)
+        if end < 0:
+            return [], reset
+        end += len(_PLACEMARK_END)
+
+        positions = None
+        if self.offset == 0:
+            self._wrap_start = _root_start_tag(data) or _WRAP_START
+            if data.rstrip().endswith(_WRAP_END):
+                positions = self._read_document(data)
+        if positions is None:
+            positions = self._read_blocks(data, end)
+        self.offset += end
+        # 파일 교체 판별용으로 offset 바로 앞의 바이트를 기억한다
+        self._mark = (self._mark + data[:end])[-MARK_BYTES:]
+        return positions, reset
+
+    def _read_document(self, data):
+        # 다 쓴 파일은 Placemark마다 파싱하는 것보다 한 번에 파싱하는 편이 빠르다
+        try:
+            with profiling.span('xml_parse'):
+                root = ET.fromstring(data)
+        except ET.ParseError:
+            return None
+        positions = positions_from_root(root, self.position)
+        self.count += len(root.findall('.//kml:Placemark', NS))
+        return positions
+
+    def _read_blocks(self, data, end):
+        positions = []
+        start = data.find(_PLACEMARK_START)
+        while 0 <= start < end:
+            stop = data.find(_PLACEMARK_END, start) + len(_PLACEMARK_END)
+            block = data[start:stop]
+            start = data.find(_PLACEMARK_START, stop)
+            self.count += 1
+            try:
+                placemark = ET.fromstring(self._wrap_start + block + _WRAP_END)[0]
+            except ET.ParseError:
+                self.errors += 1
+                profiling.count('kml.parse_errors')
+                continue
+            pos = self.position(placemark)
+            if pos is not None:
+                positions.append(pos)
+        profiling.count('kml.placemarks', len(positions))
+        positions.sort(key=lambda x: x[0])
+        return positions
+
+
 def main():
+    profiling.enable_from_argv()
     if len(sys.argv) < 2:
-        print('사용법: python list_kml_positions.py <파일.kml>')
+        print('사용법: python -m mde kml list <파일.kml>')
         return
 
     path = sys.argv[1]
@@ -0,0 +1,174 @@
+import csv
+import os
+import sys
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from math import cos, radians
+
+from Tag_Tracking_Check.list_kml_positions import parse_kml
+from Tag_Tracking_Check.route_stops import haversine, parse_path_txt, short_place, summarize_stops
+
+import profiling
+
+# 위도 1도당 거리 (m)
+METERS_PER_DEG = 111320.0
+
+
+class StopIndex:
+    """Stops of one route, indexed once and shared by every device.
+
+    Stops are sorted by latitude so each fix only runs haversine against the
+    stops inside its latitude band and longitude box; the result is the same
+    as ``group_positions`` for the same radius.
+    """
+
+    def __init__(self, entries, radius=300):
+        self.entries = entries
+        self.radius = radius
+        order = sorted(range(len(entries)), key=lambda i: entries[i]["lat"])
+        self._places = [entries[i]["place"] for i in order]
+        self._lats = [entries[i]["lat"] for i in order]
+        self._lons = [entries[i]["lon"] for i in order]
+        self._dlat = radius / METERS_PER_DEG
+        max_lat = max((abs(e["lat"]) for e in entries), default=0.0)
+        self._dlon = radius / (METERS_PER_DEG * max(cos(radians(min(max_lat + self._dlat, 89.0))), 1e-6))
+
+    def group(self, positions):
+        groups = {e["place"]: [] for e in self.entries}
+        lats, lons, places = self._lats, self._lons, self._places
+        evaluations = 0
+        for dt, lat, lon in positions:
+            lo = bisect_left(lats, lat - self._dlat)
+            hi = bisect_right(lats, lat + self._dlat)
+            for k in range(lo, hi):
+                if abs(lons[k] - lon) > self._dlon:
+                    continue
+                evaluations += 1
+                if haversine(lon, lat, lons[k], lats[k]) <= self.radius:
+                    groups[places[k]].append((dt, lat, lon))
+        profiling.count("distance_evaluations", evaluations)
+        return groups
+
+    def score(self, positions):
+        return summarize_stops(self.entries, self.group(positions))
+
+
+def load_track(path):
+    # KML은 그대로, TRACKING 로그는 정제(trajectory_clean)한 뒤 사용한다
+    if path.lower().endswith(".kml"):
+        return parse_kml(path)
+    from tracking_log import iter_tracking_fixes
+    from trajectory_clean import clean_track
+
+    positions, _ = clean_track(iter_tracking_fixes(path))
+    return positions
+
+
+def _load_and_score(path, index):
+    return index.score(load_track(path))
+
+
+def device_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def device_names(paths):
+    # 파일 이름이 겹치면 상위 폴더 이름을 붙이고, 그래도 겹치면 #n을 붙인다
+    names = [device_name(p) for p in paths]
+    dup = {n for n in names if names.count(n) > 1}
+    names = [f"{os.path.basename(os.path.dirname(os.path.abspath(p)))}/{n}" if n in dup else n
+             for p, n in zip(paths, names)]
+    seen = {}
+    unique = []
+    for n in names:
+        seen[n] = seen.get(n, 0) + 1
+        unique.append(n if seen[n] == 1 else f"{n}#{seen[n]}")
+    return unique
+
+
+@profiling.profiled("compare_devices")
+def compare_devices(entries, track_paths, radius=300, workers=None):
+    """Score every track against every stop.
+
+    Tracks are loaded and scored in a process pool; the stop index is built
+    once here and shipped to the workers. Returns ``{device: {order: row}}``
+    where each row is a ``summarize_stops`` row; device names are unique
+    (see ``device_names``).
+    """
+    index = StopIndex(entries, radius)
+    names = device_names(track_paths)
+    results = {}
+    if len(track_paths) == 1 or workers == 1:
+        for name, path in zip(names, track_paths):
+            results[name] = index.score(load_track(path))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # worker에서 잰 span/counter는 결과와 함께 받아 합친다
+            enabled = profiling.is_enabled()
+            futures = [(name, pool.submit(profiling.call_collected, enabled, _load_and_score, path, index))
+                       for name, path in zip(names, track_paths)]
+            for name, future in futures:
+                results[name], snap = future.result()
+                profiling.merge(snap)
+    return {name: {row["order"]: row for row in rows} for name, rows in results.items()}
+
+
+def delay_matrix(entries, results):
+    """Device x stop table: header row and one row per device of "diff result" cells."""
+    header = ["device"] + [f"{i}. {short_place(e['place'])}" for i, e in enumerate(entries, 1)]
+    rows = []
+    for name, by_order in results.items():
+        cells = [name]
+        for order in range(1, len(entries) + 1):
+            row = by_order.get(order)
+            if row is None:
+                cells.append("-")
+            else:
+                cells.append(f"{row['diff']} {row['result']}".strip())
+        rows.append(cells)
+    return header, rows
+
+
+def pass_counts(results):
+    return {
+        name: sum(1 for row in by_order.values() if row["result"] == "Pass")
+        for name, by_order in results.items()
+    }
+
+
+def main():
+    profiling.enable_from_argv()
+    args = sys.argv[1:]
+    workers = None
+    out_csv = None
+    if "--workers" in args:
+        i = args.index("--workers")
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    if "--csv" in args:
+        i = args.index("--csv")
+        out_csv = args[i + 1]
+        del args[i:i + 2]
+    if len(args) < 2:
+        print("사용법: python -m mde route devices <이동경로.txt> <track1.kml|TRACKING.txt> ... [--workers N] [--csv out.csv]")
+        return
+
+    entries = parse_path_txt(args[0])
+    results = compare_devices(entries, args[1:], workers=workers)
+    header, rows = delay_matrix(entries, results)
+    if out_csv:
+        with open(out_csv, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        print("CSV 저장:", out_csv)
+        return
+    counts = pass_counts(results)
+    for cells in rows:
+        print(f"{cells[0]} ({counts[cells[0]]}/{len(entries)} Pass)")
+        for title, cell in zip(header[1:], cells[1:]):
+            print(f"  {title}: {cell}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import csv
+from math import radians, cos, sin, asin, sqrt
+
+import profiling
+
+# 거리 계산을 위한 haversine 함수 (단위: 미터)
+def haversine(lon1, lat1, lon2, lat2):
+    R = 6371e3
+    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
+    c = 2 * asin(sqrt(a))
+    return R * c
+
+# 이동경로.txt 파싱
+def parse_path_txt(path):
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # 헤더 건너뜀
+        for row in reader:
+            # 최소 6개 컬럼(순서, 장소, 경도, 위도, 도착알림, 출발알림)이 있어야 함
+            if len(row) < 6:
+                continue
+            place = row[1]
+            lon = float(row[2])
+            lat = float(row[3])
+            arrive_alert = row[4].replace(".", ":").strip()
+            depart_alert = row[5].replace(".", ":").strip()
+            entries.append({
+                "place": place,
+                "lon": lon,
+                "lat": lat,
+                "arrive_alert": arrive_alert,
+                "depart_alert": depart_alert,
+            })
+    return entries
+
+# KML 위치 정보를 장소 기준으로 그룹화
+@profiling.profiled("group_positions")
+def group_positions(entries, kml_positions, radius=300):
+    profiling.count("distance_evaluations", len(entries) * len(kml_positions))
+    groups = {e["place"]: [] for e in entries}
+    for dt, lat, lon in kml_positions:
+        for e in entries:
+            dist = haversine(lon, lat, e["lon"], e["lat"])
+            if dist <= radius:
+                groups[e["place"]].append((dt, lat, lon))
+    return groups
+
+# 장소 이름만 추출 (주소 부분 제거)
+def short_place(name: str) -> str:
+    if "(" in name:
+        return name.split("(")[0].strip()
+    return name.strip()
+
+# 도착알림이 도착 시각(분 단위 내림) 기준 이 범위(분) 안이면 Pass
+PASS_WINDOW = (0, 2)
+
+# 장소별 도착/출발 시간과 도착알림 Pass/Fail 판정 (도착 시간순)
+def summarize_stops(entries, groups, window=PASS_WINDOW):
+    summary_rows = []
+    for order, e in enumerate(entries, 1):
+        place = e["place"]
+        rows = groups.get(place, [])
+        if not rows:
+            continue
+        arrive_dt = rows[0][0]
+        depart_dt = rows[-1][0]
+        alert_str = e.get("arrive_alert", "")
+
+        diff_display = ""
+        result = ""
+        if alert_str and alert_str != "-":
+            try:
+                h, m = map(int, alert_str.split(":")[:4])
+                alert_dt = arrive_dt.replace(hour=h, minute=m, second=0, microsecond=0)
+                arrive_floor = arrive_dt.replace(second=0, microsecond=0)
+                diff_min = (alert_dt - arrive_floor).total_seconds() / 60
+
+                diff_display = f"{diff_min:.1f}"
+                result = "Pass" if window[0] <= diff_min <= window[1] else "Fail"
+            except ValueError:
+                result = "Fail"
+        else:
+            result = "Fail"
+
+        summary_rows.append({
+            "order": order,
+            "place": place,
+            "arrive": arrive_dt,
+            "depart": depart_dt,
+            "alert": alert_str,
+            "diff": diff_display,
+            "result": result,
+        })
+
+    summary_rows.sort(key=lambda x: x["arrive"])
+    return summary_rows
@@ -0,0 +1,204 @@
+import csv
+import os
+import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+from Tag_Tracking_Check.list_kml_positions import parse_kml
+from Tag_Tracking_Check.route_stops import haversine, parse_path_txt, summarize_stops
+
+import profiling
+
+DEFAULT_RADII = (100, 200, 300, 400, 500)
+DEFAULT_WINDOWS = (1, 2, 3, 5)
+DEFAULT_CLEANING = ("raw",)
+
+CSV_COLUMNS = ("cleaning", "radius", "window", "drives", "stops", "passed", "pass_rate")
+
+
+def parse_cleaning(spec):
+    """``raw`` or ``<provider>[+<provider>...][@<max_accuracy>]``, e.g. ``fused@50``."""
+    if spec == "raw":
+        return None
+    providers, _, acc = spec.partition("@")
+    options = {"providers": tuple(p for p in providers.split("+") if p)}
+    options["max_accuracy"] = float(acc) if acc else None
+    return options
+
+
+def _raw_positions(path):
+    # 드라이브마다 한 번만 파싱한다; fix dict는 정제 규칙에, 위치 tuple은 거리 표에 쓴다
+    if path.lower().endswith(".kml"):
+        fixes = parse_kml(path)
+        return fixes, list(fixes)
+    from tracking_log import parse_tracking_log
+
+    fixes = parse_tracking_log(path)
+    return fixes, [(f["time"], f["lat"], f["lon"]) for f in fixes]
+
+
+def _clean_mask(fixes, cleaning):
+    """Which raw fixes survive ``cleaning`` (None for ``raw``).
+
+    The sweep's presets only remove points (no smoothing), so a preset is
+    fully described by a mask over the raw fix indices.
+    """
+    options = parse_cleaning(cleaning)
+    if options is None:
+        return None
+    from trajectory_clean import TrajectoryCleaner, fixes_to_columns
+
+    cols = fixes_to_columns(fixes)
+    cols["index"] = list(range(len(fixes)))
+    with profiling.span("clean_mask"):
+        kept = TrajectoryCleaner(**options).feed(cols, final=True)["index"]
+    mask = [False] * len(fixes)
+    for i in kept:
+        mask[i] = True
+    return mask
+
+
+class DistanceTable:
+    """Point-to-stop distances of one track, computed once for the whole sweep.
+
+    For each stop the raw fixes are sorted by distance once. ``ranges(mask)``
+    keeps the fixes of one cleaning preset and adds running min/max of the
+    fix index, so the first and last fix within any radius is a bisect away
+    and no haversine is re-evaluated across radii, windows or presets.
+    """
+
+    def __init__(self, entries, positions):
+        self.entries = entries
+        self.positions = positions
+        self._sorted = {}
+        with profiling.span("distance_table"):
+            for e in entries:
+                pairs = sorted(
+                    (haversine(lon, lat, e["lon"], e["lat"]), i)
+                    for i, (_, lat, lon) in enumerate(positions)
+                )
+                self._sorted[e["place"]] = ([d for d, _ in pairs], [i for _, i in pairs])
+        profiling.count("distance_evaluations", len(entries) * len(positions))
+
+    def ranges(self, mask=None):
+        ranges = {}
+        for place, (dists, order) in self._sorted.items():
+            if mask is not None:
+                kept = [k for k, i in enumerate(order) if mask[i]]
+                dists = [dists[k] for k in kept]
+                order = [order[k] for k in kept]
+            ranges[place] = (dists, list(accumulate(order, min)), list(accumulate(order, max)))
+        return ranges
+
+    def groups(self, ranges, radius):
+        # summarize_stops는 각 그룹의 첫/마지막 점만 사용한다
+        groups = {}
+        for place, (dists, first, last) in ranges.items():
+            k = bisect_right(dists, radius)
+            groups[place] = [self.positions[first[k - 1]], self.positions[last[k - 1]]] if k else []
+        return groups
+
+
+def _evaluate(entries, path, cleanings, radii, windows):
+    fixes, positions = _raw_positions(path)
+    table = DistanceTable(entries, positions)
+    rows = []
+    for cleaning in cleanings:
+        ranges = table.ranges(_clean_mask(fixes, cleaning))
+        for radius in radii:
+            groups = table.groups(ranges, radius)
+            for window in windows:
+                summary = summarize_stops(entries, groups, window=(0, window))
+                passed = sum(1 for row in summary if row["result"] == "Pass")
+                rows.append((cleaning, radius, window, passed))
+    return rows
+
+
+@profiling.profiled("sweep")
+def sweep(entries, drives, radii=DEFAULT_RADII, windows=DEFAULT_WINDOWS,
+          cleanings=DEFAULT_CLEANING, workers=None):
+    """Pass counts over radius x window x cleaning, summed across drives.
+
+    One task per drive runs in a process pool: the drive is parsed once and
+    its distance table is shared by every cleaning preset, radius and window.
+    """
+    totals = {}
+    enabled = profiling.is_enabled()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(profiling.call_collected, enabled, _evaluate, entries, path, cleanings, radii, windows)
+                   for path in drives]
+        for future in futures:
+            rows, snap = future.result()
+            profiling.merge(snap)
+            for cleaning, radius, window, passed in rows:
+                key = (cleaning, radius, window)
+                totals[key] = totals.get(key, 0) + passed
+
+    stops = len(entries) * len(drives)
+    rows = []
+    for cleaning in cleanings:
+        for radius in radii:
+            for window in windows:
+                passed = totals.get((cleaning, radius, window), 0)
+                rows.append({
+                    "cleaning": cleaning,
+                    "radius": radius,
+                    "window": window,
+                    "drives": len(drives),
+                    "stops": stops,
+                    "passed": passed,
+                    "pass_rate": f"{passed / stops:.3f}" if stops else "",
+                })
+    return rows
+
+
+def write_csv(rows, path):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _numbers(text):
+    values = (float(v) for v in text.split(",") if v)
+    return tuple(int(v) if v.is_integer() else v for v in values)
+
+
+def main():
+    profiling.enable_from_argv()
+    args = sys.argv[1:]
+    options = {}
+    flags = {
+        "--radius": ("radii", _numbers),
+        "--window": ("windows", _numbers),
+        "--clean": ("cleanings", lambda v: tuple(c for c in v.split(",") if c)),
+        "--workers": ("workers", int),
+    }
+    for flag, (key, conv) in flags.items():
+        if flag in args:
+            i = args.index(flag)
+            options[key] = conv(args[i + 1])
+            del args[i:i + 2]
+    out_csv = "sweep.csv"
+    if "--out" in args:
+        i = args.index("--out")
+        out_csv = args[i + 1]
+        del args[i:i + 2]
+    if len(args) < 2:
+        print("사용법: python -m mde route sweep <이동경로.txt> <drive.kml|TRACKING.txt> ... "
+              "[--radius 100,200,300] [--window 1,2,3] [--clean raw,fused@50,fused+network@100] "
+              "[--workers N] [--out sweep.csv]")
+        return
+
+    entries = parse_path_txt(args[0])
+    rows = sweep(entries, [os.path.abspath(p) for p in args[1:]], **options)
+    write_csv(rows, out_csv)
+    best = max(rows, key=lambda r: r["passed"])
+    print(f"{len(rows)} 조합 -> {out_csv}")
+    print(f"최고: cleaning={best['cleaning']} radius={best['radius']} window={best['window']} "
+          f"pass {best['passed']}/{best['stops']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import sys
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta, timezone
 
+import profiling
+
 KST = timezone(timedelta(hours=9))
 
 NS = {
@@ -9,12 +11,16 @@ NS = {
 }
 
 
+@profiling.profiled('parse_kml')
 def parse_kml(file_path):
-    tree = ET.parse(file_path)
+    with profiling.span('xml_parse'):
+        tree = ET.parse(file_path)
     root = tree.getroot()
 
     positions = []
-    for placemark in root.findall('.//kml:Placemark', NS):
+    placemarks = root.findall('.//kml:Placemark', NS)
+    profiling.count('kml.placemarks', len(placemarks))
+    for placemark in placemarks:
         when_elem = placemark.find('.//kml:TimeStamp/kml:when', NS)
         coord_elem = placemark.find('.//kml:Point/kml:coordinates', NS)
 
@@ -36,8 +42,9 @@ def parse_kml(file_path):
 
 
 def main():
+    profiling.enable_from_argv()
     if len(sys.argv) < 2:
-        print('사용법: python list_kml_positions.py <파일.kml>')
+        print('사용법: python -m Tag_Tracking_Check_2.list_kml_positions <파일.kml>')
         return
 
     path = sys.argv[1]
@@ -0,0 +1,73 @@
+"""Startup-time benchmark for ``python -m mde``.
+
+Runs each measurement in a fresh interpreter and reports the median wall
+time next to a bare ``python -c pass`` baseline, so the numbers compare
+across machines. Fails (exit 1) if a headless command loads tkinter, or if
+``--max-ms`` is given and the dispatcher's own overhead over the baseline
+exceeds it.
+
+    python benchmarks/bench_startup.py [--runs 10] [--max-ms 30]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import sys
+from importlib import import_module
+import mde.cli
+module = import_module({module!r})
+print(int('tkinter' in sys.modules))
+"""
+
+
+def timed(args, runs):
+    samples = []
+    out = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(args, cwd=ROOT, capture_output=True, text=True)
+        samples.append((time.perf_counter() - start) * 1000)
+        out = proc.stdout
+    return statistics.median(samples), out
+
+
+def main():
+    args = sys.argv[1:]
+    runs = 10
+    max_ms = None
+    if "--runs" in args:
+        runs = int(args[args.index("--runs") + 1])
+    if "--max-ms" in args:
+        max_ms = float(args[args.index("--max-ms") + 1])
+
+    sys.path.insert(0, ROOT)
+    from mde.cli import COMMANDS
+
+    baseline, _ = timed([sys.executable, "-c", "pass"], runs)
+    dispatcher, _ = timed([sys.executable, "-m", "mde", "--help"], runs)
+    print(f"{'python -c pass':<24} {baseline:7.1f} ms")
+    print(f"{'mde --help':<24} {dispatcher:7.1f} ms  (+{dispatcher - baseline:.1f})")
+
+    failed = False
+    for words, module, gui, _ in COMMANDS:
+        ms, out = timed([sys.executable, "-c", PROBE.format(module=module)], runs)
+        loads_tk = out.strip() == "1"
+        note = "tkinter" if loads_tk else ""
+        if loads_tk and not gui:
+            note += "  <- headless command loads tkinter"
+            failed = True
+        print(f"{' '.join(words):<24} {ms:7.1f} ms  (+{ms - baseline:.1f}) {note}")
+
+    if max_ms is not None and dispatcher - baseline > max_ms:
+        print(f"mde --help overhead {dispatcher - baseline:.1f} ms > {max_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import os
+import sys
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow는 내보내기에만 필요하다
+    pa = None
+    pq = None
+
+BATCH_SIZE = 65536
+
+# 모든 소스(KML, TRACKING, GNSS, dumpstate)가 같은 스키마를 쓴다.
+# 해당 소스에 없는 컬럼은 null로 채운다.
+STRING_COLUMNS = ("source", "provider", "kind", "package", "reason")
+FLOAT_COLUMNS = ("lat", "lon", "accuracy", "speed", "bearing")
+COLUMNS = ("source", "time") + FLOAT_COLUMNS + ("provider", "kind", "package", "reason", "details")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow가 필요합니다: pip install pyarrow")
+
+
+def export_schema():
+    _require_pyarrow()
+    dict_type = pa.dictionary(pa.int32(), pa.string())
+    fields = []
+    for name in COLUMNS:
+        if name in STRING_COLUMNS:
+            fields.append(pa.field(name, dict_type))
+        elif name == "time":
+            fields.append(pa.field(name, pa.timestamp("ms", tz="+09:00")))
+        elif name in FLOAT_COLUMNS:
+            fields.append(pa.field(name, pa.float64()))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+class ColumnarWriter:
+    """Stream rows into an Arrow IPC (.arrow) or Parquet (.parquet) file.
+
+    Rows are buffered column-wise and flushed every ``batch_size`` rows.
+    String columns share one growing dictionary per column for the whole
+    file, so each batch only adds a dictionary delta.
+    """
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE):
+        _require_pyarrow()
+        self.path = path
+        self.batch_size = batch_size
+        self.schema = export_schema()
+        self.rows_written = 0
+        self._dicts = {name: {} for name in STRING_COLUMNS}
+        self._buffer = {name: [] for name in COLUMNS}
+        if path.endswith(".parquet"):
+            self._writer = pq.ParquetWriter(path, self.schema)
+        else:
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_file(path, self.schema, options=options)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_rows(self, rows: Iterable[Dict]) -> None:
+        buf = self._buffer
+        for row in rows:
+            for name in COLUMNS:
+                buf[name].append(row.get(name))
+            if len(buf["source"]) >= self.batch_size:
+                self.flush()
+
+    def _dictionary_column(self, name: str, values: List):
+        mapping = self._dicts[name]
+        indices = []
+        for v in values:
+            if v is None or v == "":
+                indices.append(None)
+                continue
+            idx = mapping.get(v)
+            if idx is None:
+                idx = mapping[v] = len(mapping)
+            indices.append(idx)
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()),
+            pa.array(list(mapping), type=pa.string()),
+        )
+
+    def flush(self) -> None:
+        buf = self._buffer
+        if not buf["source"]:
+            return
+        arrays = []
+        for field in self.schema:
+            values = buf[field.name]
+            if field.name in STRING_COLUMNS:
+                arrays.append(self._dictionary_column(field.name, values))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        self._writer.write_batch(batch)
+        self.rows_written += batch.num_rows
+        for values in buf.values():
+            values.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+
+def kml_rows(path: str) -> Iterator[Dict]:
+    from Tag_Tracking_Check.list_kml_positions import parse_kml
+
+    for dt, lat, lon in parse_kml(path):
+        yield {"source": "kml", "time": dt, "lat": lat, "lon": lon}
+
+
+def tracking_rows(path: str) -> Iterator[Dict]:
+    from tracking_log import iter_tracking_fixes
+
+    for fix in iter_tracking_fixes(path):
+        yield {
+            "source": "tracking",
+            "time": fix["time"],
+            "lat": fix["lat"],
+            "lon": fix["lon"],
+            "accuracy": fix["accuracy"],
+            "speed": fix["speed"],
+            "bearing": fix["bearing"],
+            "provider": fix["provider"],
+        }
+
+
+def gnss_rows(path: str) -> Iterator[Dict]:
+    from tracking_log import iter_gnss_epochs
+
+    for e in iter_gnss_epochs(path):
+        yield {
+            "source": "gnss",
+            "time": e["time"],
+            "lat": e["lat"],
+            "lon": e["lon"],
+            "speed": e["speed"],
+            "bearing": e["bearing"],
+            "provider": "gps",
+        }
+
+
+def dumpstate_rows(path: str, year: int) -> Iterator[Dict]:
+    from dumpstate_analyzer import parse_fc_events, parse_anr_events
+    from event_timeline import parse_dumpstate_time
+
+    # 분석 함수가 같은 이벤트를 두 번 돌려주므로 한 번만 내보낸다. 시각을 해석하지
+    # 못한 이벤트끼리 합쳐지지 않도록 원래 시각 문자열과 (크래시 표시 다음) 첫 줄까지 비교한다
+    seen = set()
+    for kind, events in (("F/C", parse_fc_events(path)), ("ANR", parse_anr_events(path))):
+        for e in events:
+            dt = parse_dumpstate_time(e.get("timestamp", ""), year)
+            text = e.get("details") or e.get("line") or ""
+            first = next((l.strip() for l in text.splitlines()
+                          if l.strip() and "beginning of crash" not in l.lower()), "")
+            key = (kind, e.get("timestamp", ""), e.get("package", ""), first)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield {
+                "source": "dumpstate",
+                "time": dt,
+                "kind": kind,
+                "package": e.get("package"),
+                "reason": e.get("cause") or e.get("reason"),
+                "details": e.get("details") or e.get("line"),
+            }
+
+
+def rows_for(path: str, year: int) -> Iterator[Dict]:
+    name = os.path.basename(path)
+    if name.lower().endswith(".kml"):
+        return kml_rows(path)
+    if name.upper().startswith("TRACKING"):
+        return chain(tracking_rows(path), gnss_rows(path))
+    return dumpstate_rows(path, year)
+
+
+def export_files(out_path: str, inputs: List[str], year: int = None,
+                 batch_size: int = BATCH_SIZE) -> int:
+    year = year or datetime.now().year
+    with ColumnarWriter(out_path, batch_size) as writer:
+        for path in inputs:
+            writer.write_rows(rows_for(path, year))
+    return writer.rows_written
+
+
+def main():
+    args = sys.argv[1:]
+    year = None
+    if "--year" in args:
+        i = args.index("--year")
+        year = int(args[i + 1])
+        del args[i:i + 2]
+    if len(args) < 2:
+        print("Usage: python columnar_export.py <out.parquet|out.arrow> <입력 파일...> [--year YYYY]")
+        return
+    try:
+        count = export_files(args[0], args[1:], year)
+    except RuntimeError as e:
+        print(e)
+        return
+    print(f"{count} rows ->", args[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,28 @@ import re
 import sys
 from typing import List, Dict
 
+import profiling
 
-def parse_fc_events(path: str) -> List[Dict[str, str]]:
+
+def _open_lines(path: str, index=None):
+    # index(IndexBuilder)가 주어지면 같은 읽기에서 검색 색인도 만든다
+    if index is None:
+        return open(path, 'r', encoding='utf-8', errors='ignore')
+    return index.reader(path)
+
+
+@profiling.profiled("parse_fc_events")
+def parse_fc_events(path: str, index=None) -> List[Dict[str, str]]:
     events = []
 
-    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+    with _open_lines(path, index) as f:
         capturing = False
         package = None
         timestamp = None
         cause = None
         event_lines = []
-        for line in f:
+        lineno = 0
+        for lineno, line in enumerate(f, 1):
             if 'beginning of crash' in line.lower():
                 capturing = True
                 package = None
@@ -44,6 +55,7 @@ def parse_fc_events(path: str) -> List[Dict[str, str]]:
                 'cause': cause or '',
                 'details': '\n'.join(event_lines)
             })
+    profiling.count("dumpstate.lines_scanned", lineno)
 
     with open(path, "r", encoding="utf-8", errors="ignore") as f:
         capturing = False
@@ -51,7 +63,8 @@ def parse_fc_events(path: str) -> List[Dict[str, str]]:
         timestamp = None
         reason = None
         event_lines = []
-        for line in f:
+        lineno = 0
+        for lineno, line in enumerate(f, 1):
             lower = line.lower()
             if "beginning of crash" in lower:
                 capturing = True
@@ -98,15 +111,18 @@ def parse_fc_events(path: str) -> List[Dict[str, str]]:
                     "details": "\n".join(event_lines),
                 }
             )
+    profiling.count("dumpstate.lines_scanned", lineno)
 
     return events
 
 
+@profiling.profiled("parse_anr_events")
 def parse_anr_events(path: str) -> List[Dict[str, str]]:
     events = []
 
     with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
+        lineno = 0
+        for lineno, line in enumerate(f, 1):
             if 'ServiceANR' in line:
                 m = re.match(r'(\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+)', line)
                 ts = m.group(1) if m else ''
@@ -119,9 +135,11 @@ def parse_anr_events(path: str) -> List[Dict[str, str]]:
                 m = re.match(r'(\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+)', line)
                 ts = m.group(1) if m else ''
                 events.append({'timestamp': ts, 'package': '', 'reason': '', 'line': line.strip()})
+    profiling.count("dumpstate.lines_scanned", lineno)
 
     with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
+        lineno = 0
+        for lineno, line in enumerate(f, 1):
             if "ServiceANR" in line:
                 ts_match = re.match(r"(\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+)", line)
                 ts = ts_match.group(1) if ts_match else ""
@@ -134,14 +152,25 @@ def parse_anr_events(path: str) -> List[Dict[str, str]]:
                 ts_match = re.match(r"(\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+)", line)
                 ts = ts_match.group(1) if ts_match else ""
                 events.append({"timestamp": ts, "package": "", "reason": "ANR", "line": line.strip()})
+    profiling.count("dumpstate.lines_scanned", lineno)
 
     return events
 
 
 def main():
-    path = sys.argv[1] if len(sys.argv) > 1 else 'dumpstate.txt'
-    fc_events = parse_fc_events(path)
+    profiling.enable_from_argv()
+    args = sys.argv[1:]
+    index = None
+    if '--index' in args:
+        from dumpstate_index import IndexBuilder
+
+        args.remove('--index')
+        index = IndexBuilder()
+    path = args[0] if args else 'dumpstate.txt'
+    fc_events = parse_fc_events(path, index=index)
     anr_events = parse_anr_events(path)
+    if index is not None:
+        print(f"Index saved: {index.save(path)}")
 
     print('=== App F/C Events ===')
     if not fc_events:
@@ -1,7 +1,10 @@
+import threading
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 
+import profiling
 from dumpstate_analyzer import parse_fc_events, parse_anr_events
+from dumpstate_index import DEFAULT_LIMIT, open_index
 
 
 class DumpstateGUI(tk.Tk):
@@ -9,6 +12,8 @@ class DumpstateGUI(tk.Tk):
         super().__init__()
         self.title("Dumpstate Analyzer")
         self.geometry("700x500")
+        self.index = None
+        self._index_job = None
 
         self._create_widgets()
 
@@ -19,8 +24,19 @@ class DumpstateGUI(tk.Tk):
         open_btn = ttk.Button(toolbar, text="파일 선택", command=self.open_file)
         open_btn.pack(side=tk.LEFT, padx=5)
 
-        self.text = tk.Text(self, wrap=tk.NONE)
-        self.text.pack(fill=tk.BOTH, expand=True)
+        search_btn = ttk.Button(toolbar, text="검색", command=self.search)
+        search_btn.pack(side=tk.RIGHT, padx=5)
+        self.query = ttk.Entry(toolbar, width=40)
+        self.query.pack(side=tk.RIGHT)
+        self.query.bind("<Return>", lambda e: self.search())
+        ttk.Label(toolbar, text="패키지 / pid: / exc: / tag:").pack(side=tk.RIGHT, padx=5)
+
+        panes = ttk.PanedWindow(self, orient=tk.VERTICAL)
+        panes.pack(fill=tk.BOTH, expand=True)
+        self.text = tk.Text(panes, wrap=tk.NONE, height=12)
+        self.results = tk.Text(panes, wrap=tk.NONE, height=12)
+        panes.add(self.text, weight=1)
+        panes.add(self.results, weight=1)
 
     def open_file(self):
         path = filedialog.askopenfilename(filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")])
@@ -33,6 +49,57 @@ class DumpstateGUI(tk.Tk):
             messagebox.showerror("오류", str(e))
             return
 
+        with profiling.span("text_insert"):
+            self._show_events(fc_events, anr_events)
+        self.results.delete("1.0", tk.END)
+        self._start_index(path)
+
+    def _start_index(self, path):
+        # 검색 색인은 이벤트를 보여 준 뒤 작업 스레드에서 연다 (없거나 오래됐으면 만든다)
+        if self._index_job is not None and self._index_job["path"] == path:
+            return  # 같은 파일의 색인을 이미 만들고 있다
+        self.index = None
+        job = self._index_job = {"path": path, "index": None, "error": None}
+
+        def build():
+            try:
+                job["index"] = open_index(path)
+            except OSError as e:
+                job["error"] = e
+
+        thread = threading.Thread(target=build, daemon=True)
+        thread.start()
+        self.after(200, self._poll_index, thread, job)
+
+    def _poll_index(self, thread, job):
+        if job is not self._index_job:
+            return  # 그 사이 다른 파일을 열었다
+        if thread.is_alive():
+            self.after(200, self._poll_index, thread, job)
+            return
+        self._index_job = None
+        if job["error"] is not None:
+            messagebox.showwarning("색인", f"검색 색인을 만들지 못했습니다: {job['error']}")
+            return
+        self.index = job["index"]
+
+    def search(self):
+        query = self.query.get().strip()
+        if not query:
+            return
+        if self.index is None:
+            if self._index_job is not None:
+                messagebox.showinfo("검색", "검색 색인을 만드는 중입니다. 잠시 후 다시 검색하세요.")
+            else:
+                messagebox.showinfo("검색", "먼저 dumpstate 파일을 선택하세요.")
+            return
+        total, hits = self.index.search(query, DEFAULT_LIMIT)
+        self.results.delete("1.0", tk.END)
+        shown = f" (처음 {len(hits)}건 표시)" if len(hits) < total else ""
+        self.results.insert(tk.END, f"=== '{query}' {total}건{shown} ===\n")
+        self.results.insert(tk.END, "".join(f"{lineno}: {text}\n" for lineno, _, text in hits))
+
+    def _show_events(self, fc_events, anr_events):
         self.text.delete("1.0", tk.END)
         self.text.insert(tk.END, "=== App F/C Events ===\n")
         if not fc_events:
@@ -50,6 +117,7 @@ class DumpstateGUI(tk.Tk):
             self.text.insert(tk.END, f"[{i}] Time: {e['timestamp']}{pkg}{reason}\n")
 
 def main():
+    profiling.enable_from_argv()
     app = DumpstateGUI()
     app.mainloop()
 
@@ -0,0 +1,267 @@
+import json
+import os
+import re
+import struct
+import sys
+from array import array
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import profiling
+
+MAGIC = b"MDEIDX3\n"  # 색인 규칙이 바뀌면 올려서 이전 색인을 다시 만들게 한다
+INDEX_SUFFIX = ".idx"
+KINDS = ("pkg", "pid", "exc", "tag")
+DEFAULT_LIMIT = 1000
+
+# logcat 줄: "MM-DD HH:MM:SS.mmm [PID TID] L TAG: message"
+_LOGCAT = re.compile(r"\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+\s+(?:(\d+)\s+\d+\s+)?[VDIWEFA]\s+([^\s:]+)\s*:")
+# 크래시 블록 등의 "pid: 1234", "PID: 1234", "pid 1234"
+_PID = re.compile(r"\b(?:pid|PID|Pid)[:=]?\s*(\d+)\b")
+# 정규화된 클래스 이름(java.lang.String, android.os.Handler)의 앞부분은 패키지로 보지 않는다
+_PACKAGE = re.compile(r"(?<![\w.$])[a-z][a-z0-9_]*(?:\.[a-z][a-z0-9_]*)+(?![\w$]|\.[A-Za-z])")
+# 두 마디 이름 중 패키지가 아닌 파일 이름(libc.so, base.apk 등)은 색인하지 않는다
+FILE_EXTENSIONS = frozenset((
+    "so", "apk", "jar", "dex", "odex", "vdex", "oat", "art", "ko", "bin", "img",
+    "txt", "log", "xml", "json", "prop", "rc", "sh", "py", "conf", "cfg", "ini",
+    "db", "dat", "tmp", "bak", "idx", "zip", "gz", "tar", "png", "jpg", "html",
+    "kml", "java", "kt",
+))
+_EXCEPTION = re.compile(r"(?<![\w.$])(?:[A-Za-z_][\w$]*\.)*[A-Z]\w*(?:Exception|Error)\b")
+
+
+def index_path(source: str) -> str:
+    return source + INDEX_SUFFIX
+
+
+def line_keys(line: str) -> Set[str]:
+    """Index keys (``kind:value``) for one dumpstate line."""
+    keys = set()
+    m = _LOGCAT.match(line)
+    if m:
+        # logcat 줄은 머리의 PID/태그만 쓰고 나머지 검사는 메시지에만 한다
+        if m.group(1):
+            keys.add("pid:" + m.group(1))
+        keys.add("tag:" + m.group(2))
+        text = line[m.end():]
+    else:
+        text = line
+        if "pid" in line or "PID" in line or "Pid" in line:
+            for pid in _PID.findall(line):
+                keys.add("pid:" + pid)
+    if "." in text:
+        for name in _PACKAGE.findall(text):
+            if name.count(".") == 1 and name.rpartition(".")[2] in FILE_EXTENSIONS:
+                continue
+            keys.add("pkg:" + name)
+    if "Exception" in text or "Error" in text:
+        for name in _EXCEPTION.findall(text):
+            keys.add("exc:" + name)
+            # 패키지 없이 클래스 이름만으로도 찾을 수 있게 한다
+            keys.add("exc:" + name.rpartition(".")[2])
+    return keys
+
+
+class IndexBuilder:
+    """Inverted index filled while the analysis pass reads the dumpstate.
+
+    ``reader(path)`` replaces ``open(path)`` in a parse loop: it yields the
+    decoded lines and records each line's byte offset and keys on the way,
+    so the index costs no extra read of the file. ``save()`` writes it next
+    to the dumpstate for ``DumpstateIndex``.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, array] = {}
+        self.line_offsets = array("Q")
+
+    def add(self, offset: int, line: str) -> None:
+        self.line_offsets.append(offset)
+        lineno = len(self.line_offsets)
+        for key in line_keys(line):
+            lines = self.postings.get(key)
+            if lines is None:
+                lines = self.postings[key] = array("I")
+            lines.append(lineno)
+
+    @contextmanager
+    def reader(self, path: str):
+        self.postings = {}
+        self.line_offsets = array("Q")
+        with open(path, "rb") as f:
+            yield self._lines(f)
+
+    def _lines(self, f) -> Iterator[str]:
+        offset = 0
+        for raw in f:
+            line = raw.decode("utf-8", errors="ignore")
+            if line.endswith("\r\n"):
+                line = line[:-2] + "\n"
+            self.add(offset, line)
+            offset += len(raw)
+            yield line
+
+    @profiling.profiled("save_index")
+    def save(self, source: str, path: Optional[str] = None) -> str:
+        """Write the index for ``source`` (default ``<source>.idx``)."""
+        path = path or index_path(source)
+        st = os.stat(source)
+        keys = {}
+        start = 0
+        for key in sorted(self.postings):
+            n = len(self.postings[key])
+            keys[key] = [start, n]
+            start += n
+        header = json.dumps({
+            "source_size": st.st_size,
+            "source_mtime_ns": st.st_mtime_ns,
+            "byteorder": sys.byteorder,
+            "lines": len(self.line_offsets),
+            "postings": start,
+            "keys": keys,
+        }, ensure_ascii=False).encode("utf-8")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for key in sorted(self.postings):
+                self.postings[key].tofile(f)
+            self.line_offsets.tofile(f)
+        os.replace(tmp, path)
+        profiling.count("index.keys", len(keys))
+        profiling.count("index.postings", start)
+        return path
+
+
+class DumpstateIndex:
+    """Search over a saved index without loading the postings.
+
+    Only the key directory is read when the index is opened; a search reads
+    the posting lists of the matching keys and then seeks straight to each
+    hit in the dumpstate.
+
+    A query is one or more terms, all of which must match a line. A term is
+    ``kind:value`` (kind is one of ``KINDS``) or a bare value matching any
+    kind; a trailing ``*`` matches by prefix.
+    """
+
+    def __init__(self, source: str, path: str, header: Dict, data_start: int):
+        self.source = source
+        self.path = path
+        self.keys: Dict[str, List[int]] = header["keys"]
+        self.lines = header["lines"]
+        self._swap = header["byteorder"] != sys.byteorder
+        self._offset_fmt = "<Q" if header["byteorder"] == "little" else ">Q"
+        self._postings_at = data_start
+        self._offsets_at = data_start + 4 * header["postings"]
+
+    @classmethod
+    def load(cls, source: str, path: Optional[str] = None) -> Optional["DumpstateIndex"]:
+        """Open the index of ``source``; None if it is missing or out of date."""
+        path = path or index_path(source)
+        try:
+            st = os.stat(source)
+            with open(path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return None
+                (size,) = struct.unpack("<Q", f.read(8))
+                header = json.loads(f.read(size).decode("utf-8"))
+        except (OSError, ValueError, struct.error):
+            return None
+        if header["source_size"] != st.st_size or header["source_mtime_ns"] != st.st_mtime_ns:
+            return None
+        return cls(source, path, header, len(MAGIC) + 8 + size)
+
+    def match_keys(self, term: str) -> List[str]:
+        kind, sep, value = term.partition(":")
+        if sep and kind in KINDS:
+            kinds = (kind,)
+        else:
+            kinds, value = KINDS, term
+        if value.endswith("*"):
+            prefix = value[:-1]
+            return [k for k in self.keys if k.partition(":")[0] in kinds and k.partition(":")[2].startswith(prefix)]
+        return [k + ":" + value for k in kinds if k + ":" + value in self.keys]
+
+    def _postings(self, f, key: str) -> array:
+        start, n = self.keys[key]
+        f.seek(self._postings_at + 4 * start)
+        lines = array("I")
+        lines.frombytes(f.read(4 * n))
+        if self._swap:
+            lines.byteswap()
+        return lines
+
+    def lookup(self, query: str) -> List[int]:
+        """Sorted line numbers (1-based) matching every term of ``query``."""
+        result = None
+        with open(self.path, "rb") as f:
+            for term in query.split():
+                lines = set()
+                for key in self.match_keys(term):
+                    lines.update(self._postings(f, key))
+                result = lines if result is None else result & lines
+                if not result:
+                    return []
+        return sorted(result) if result else []
+
+    @profiling.profiled("index_search")
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> Tuple[int, List[Tuple[int, int, str]]]:
+        """Return ``(total, [(lineno, byte_offset, text), ...])`` for up to ``limit`` hits."""
+        linenos = self.lookup(query)
+        hits = []
+        with open(self.path, "rb") as idx, open(self.source, "rb") as src:
+            for lineno in linenos[:limit]:
+                idx.seek(self._offsets_at + 8 * (lineno - 1))
+                (offset,) = struct.unpack(self._offset_fmt, idx.read(8))
+                src.seek(offset)
+                text = src.readline().decode("utf-8", errors="ignore").rstrip("\r\n")
+                hits.append((lineno, offset, text))
+        return len(linenos), hits
+
+
+def build_index(source: str, path: Optional[str] = None) -> DumpstateIndex:
+    builder = IndexBuilder()
+    with profiling.span("build_index"):
+        with builder.reader(source) as lines:
+            for _ in lines:
+                pass
+    path = builder.save(source, path)
+    return DumpstateIndex.load(source, path)
+
+
+def open_index(source: str, rebuild: bool = False) -> DumpstateIndex:
+    """Saved index of ``source``, built first if missing or out of date."""
+    index = None if rebuild else DumpstateIndex.load(source)
+    return index or build_index(source)
+
+
+def main():
+    profiling.enable_from_argv()
+    args = sys.argv[1:]
+    rebuild = "--rebuild" in args
+    limit = DEFAULT_LIMIT
+    if "--limit" in args:
+        i = args.index("--limit")
+        limit = int(args[i + 1])
+        del args[i:i + 2]
+    args = [a for a in args if a != "--rebuild"]
+    if len(args) < 2 and not (args and rebuild):
+        print("Usage: python dumpstate_index.py <dumpstate.txt> <query...> [--limit 1000] [--rebuild]")
+        print("  query: com.x.app | pid:1234 | exc:NullPointerException | tag:ActivityManager | com.x.*")
+        return
+    index = open_index(args[0], rebuild)
+    query = " ".join(args[1:])
+    if not query:
+        print(f"{index.path}: {len(index.keys)} keys, {index.lines} lines")
+        return
+    total, hits = index.search(query, limit)
+    for lineno, _, text in hits:
+        print(f"{lineno}: {text}")
+    shown = f" ({len(hits)}건 표시)" if len(hits) < total else ""
+    print(f"-- {total}건{shown}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import profiling
+from dumpstate_analyzer import parse_fc_events, parse_anr_events
+
+KST = timezone(timedelta(hours=9))
+
+# Window around each stop arrival in which crashes/ANRs are reported (seconds)
+DEFAULT_BEFORE = 300
+DEFAULT_AFTER = 120
+
+
+def parse_dumpstate_time(ts: str, year: int, tz=KST) -> Optional[datetime]:
+    # dumpstate timestamps look like "05-27 13:25:01.123" and carry no year
+    if not ts:
+        return None
+    try:
+        dt = datetime.strptime(f"{year}-{ts[:14]}", "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+    frac = ts[14:].lstrip(".")
+    if frac.isdigit():
+        dt = dt.replace(microsecond=int(frac[:6].ljust(6, "0")))
+    return dt.replace(tzinfo=tz)
+
+
+def normalize_events(fc_events: List[Dict[str, str]], anr_events: List[Dict[str, str]],
+                     year: int, tz=KST) -> List[Dict]:
+    """Merge F/C and ANR events into one time-sorted stream.
+
+    Events without a parsable timestamp cannot be placed on the timeline and
+    are dropped. Identical (kind, time, package) records are reported once.
+    """
+    events = []
+    seen = set()
+    for kind, source in (("F/C", fc_events), ("ANR", anr_events)):
+        for e in source:
+            dt = parse_dumpstate_time(e.get("timestamp", ""), year, tz)
+            if dt is None:
+                continue
+            key = (kind, dt, e.get("package", ""))
+            if key in seen:
+                continue
+            seen.add(key)
+            events.append({
+                "kind": kind,
+                "time": dt,
+                "package": e.get("package", ""),
+                "reason": e.get("cause") or e.get("reason", ""),
+            })
+    events.sort(key=lambda x: x["time"])
+    return events
+
+
+def _attach_positions(events: List[Dict], track) -> None:
+    # Merge pass over two sorted streams: each event gets the nearest fix
+    j = 0
+    n = len(track)
+    for e in events:
+        t = e["time"]
+        while j + 1 < n and track[j + 1][0] <= t:
+            j += 1
+        best = None
+        for k in (j, j + 1):
+            if 0 <= k < n:
+                gap = abs((track[k][0] - t).total_seconds())
+                if best is None or gap < best[0]:
+                    best = (gap, track[k])
+        if best is not None:
+            e["fix"] = best[1]
+            e["fix_gap"] = best[0]
+
+
+@profiling.profiled("join_timeline")
+def join_timeline(stops: List[Dict], events: List[Dict], track=None,
+                  before: float = DEFAULT_BEFORE, after: float = DEFAULT_AFTER) -> List[Dict]:
+    """Align stop results with crash/ANR events by time window.
+
+    ``stops`` are the rows of ``summarize_stops`` and ``events`` the output of
+    ``normalize_events``; both must be sorted by time. ``track`` is an
+    optional time-sorted list of ``(dt, lat, lon)`` fixes used to locate each
+    event. Each stop gets the events in ``[arrive - before, arrive + after]``
+    and the result is a single time-ordered timeline of stop and event items.
+    Runs in O(n + m) plus the number of matches.
+    """
+    if track:
+        _attach_positions(events, track)
+
+    before_td = timedelta(seconds=before)
+    after_td = timedelta(seconds=after)
+    lo = 0
+    for stop in stops:
+        start = stop["arrive"] - before_td
+        end = stop["arrive"] + after_td
+        while lo < len(events) and events[lo]["time"] < start:
+            lo += 1
+        nearby = []
+        k = lo
+        while k < len(events) and events[k]["time"] <= end:
+            nearby.append(events[k])
+            events[k].setdefault("stops", []).append(stop["order"])
+            k += 1
+        stop["events"] = nearby
+
+    timeline = [{"type": "stop", "time": s["arrive"], "stop": s} for s in stops]
+    event_items = [{"type": "event", "time": e["time"], "event": e} for e in events]
+    # Both lists are already sorted, so merge instead of re-sorting
+    merged = []
+    i = j = 0
+    while i < len(timeline) and j < len(event_items):
+        if event_items[j]["time"] < timeline[i]["time"]:
+            merged.append(event_items[j])
+            j += 1
+        else:
+            merged.append(timeline[i])
+            i += 1
+    merged.extend(timeline[i:])
+    merged.extend(event_items[j:])
+    return merged
+
+
+def describe_offset(event_time: datetime, ref: datetime) -> str:
+    secs = (event_time - ref).total_seconds()
+    if abs(secs) < 1:
+        return "at the same time"
+    word = "earlier" if secs < 0 else "later"
+    return f"{abs(secs):.0f} s {word}"
+
+
+def format_timeline(timeline: List[Dict], only_fail: bool = False) -> List[str]:
+    lines = []
+    for item in timeline:
+        t = item["time"].strftime("%H:%M:%S")
+        if item["type"] == "stop":
+            s = item["stop"]
+            if only_fail and s["result"] == "Pass":
+                continue
+            notes = [
+                f"{e['kind']} in {e['package'] or '?'} {describe_offset(e['time'], s['arrive'])}"
+                for e in s.get("events", [])
+            ]
+            text = f"{s['result']} at stop {s['order']}"
+            if notes:
+                text += ", " + "; ".join(notes)
+            lines.append(f"{t} {text}")
+        else:
+            e = item["event"]
+            if only_fail:
+                continue
+            text = f"{e['kind']} {e['package'] or '?'}"
+            if e.get("reason"):
+                text += f" ({e['reason']})"
+            if "fix" in e:
+                _, lat, lon = e["fix"]
+                text += f" @ {lat:.6f}, {lon:.6f}"
+            lines.append(f"{t}   {text}")
+    return lines
+
+
+def main():
+    profiling.enable_from_argv()
+    if len(sys.argv) < 4:
+        print("Usage: python event_timeline.py <dumpstate.txt> <이동경로.txt> <Tracking.kml> [--fail-only]")
+        return
+    from Tag_Tracking_Check.list_kml_positions import parse_kml
+    from Tag_Tracking_Check.route_stops import parse_path_txt, group_positions, summarize_stops
+
+    dump_path, txt_path, kml_path = sys.argv[1:4]
+    only_fail = "--fail-only" in sys.argv[4:]
+
+    track = parse_kml(kml_path)
+    entries = parse_path_txt(txt_path)
+    stops = summarize_stops(entries, group_positions(entries, track))
+    year = track[0][0].year if track else datetime.now(KST).year
+    events = normalize_events(parse_fc_events(dump_path), parse_anr_events(dump_path), year)
+
+    for line in format_timeline(join_timeline(stops, events, track), only_fail):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
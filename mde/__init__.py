@@ -0,0 +1 @@
+"""Single entry point for the MDE analysis tools: ``python -m mde <command>``."""
@@ -0,0 +1,5 @@
+import sys
+
+from mde.cli import main
+
+sys.exit(main())
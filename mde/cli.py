@@ -0,0 +1,118 @@
+"""Subcommand dispatcher for the analysis tools.
+
+Only ``os`` and ``sys`` are imported up front. Each subcommand names the
+module that implements it, and that module is imported when the subcommand
+runs, so headless commands never load tkinter and ``python -m mde`` stays
+cheap when it is scripted in a loop. The tool's own ``main()`` parses the
+remaining arguments exactly as when the script is run directly.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (명령어, 모듈, GUI 여부, 설명)
+COMMANDS = (
+    (("dumpstate",), "dumpstate_analyzer", False, "F/C, ANR 이벤트 출력 <dumpstate.txt>"),
+    (("dumpstate", "gui"), "dumpstate_gui", True, "Dumpstate Analyzer GUI"),
+    (("search",), "dumpstate_index", False, "dumpstate 색인 검색 <dumpstate.txt> <query...>"),
+    (("kml", "list"), "Tag_Tracking_Check.list_kml_positions", False, "KML 위치 목록 <file.kml>"),
+    (("kml", "view"), "Tag_Tracking_Check.kml_viewer_gui", True, "Real Route Viewer GUI"),
+    (("route", "compare"), "route_compare", False, "장소별 가장 가까운 Tracking 위치 <이동경로.txt> <file.kml>"),
+    (("route", "gui"), "route_compare_gui", True, "이동 경로 비교 GUI"),
+    (("route", "devices"), "Tag_Tracking_Check.multi_device", False, "다중 기기 비교 <이동경로.txt> <track...>"),
+    (("route", "xte"), "Tag_Tracking_Check.cross_track", False, "계획 경로 대비 cross-track error"),
+    (("route", "sweep"), "Tag_Tracking_Check.threshold_sweep", False, "반경 x 시간창 파라미터 스윕"),
+    (("map",), "show_kml_path", False, "course 경로 HTML 지도 생성 <file.kml>"),
+    (("timeline",), "event_timeline", False, "dumpstate 이벤트와 장소 결과 시간 정렬"),
+    (("tracking",), "tracking_log", False, "TRACKING 로그 위치 목록"),
+    (("clean",), "trajectory_clean", False, "TRACKING 궤적 정제"),
+    (("diff",), "provider_diff", False, "provider 간 위치 차이"),
+    (("export",), "columnar_export", False, "Arrow IPC / Parquet 내보내기"),
+)
+
+
+def usage() -> str:
+    lines = ["Usage: python -m mde <command> [args...]", "", "Commands:"]
+    for words, _, gui, desc in COMMANDS:
+        name = " ".join(words)
+        lines.append(f"  {name:<18} {desc}{' (GUI)' if gui else ''}")
+    lines.append(f"  {'batch':<18} 파일(또는 -: stdin)의 명령을 한 프로세스에서 차례로 실행")
+    return "\n".join(lines)
+
+
+def resolve(args):
+    """Return ``(command, remaining_args)`` for the longest matching command."""
+    best = None
+    for command in COMMANDS:
+        words = command[0]
+        if tuple(args[:len(words)]) == words and (best is None or len(words) > len(best[0])):
+            best = command
+    if best is None:
+        return None, args
+    return best, args[len(best[0]):]
+
+
+def run(args) -> int:
+    command, rest = resolve(args)
+    if command is None:
+        print(usage())
+        return 2
+    words, module_name, _, _ = command
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    from importlib import import_module
+
+    module = import_module(module_name)
+    saved = sys.argv
+    sys.argv = [" ".join(("mde",) + words)] + list(rest)
+    try:
+        module.main()
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        sys.argv = saved
+    return 0
+
+
+def run_batch(path) -> int:
+    # 모듈은 한 번만 import되므로 반복 실행할 때 시작 비용이 들지 않는다
+    import shlex
+
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    failed = 0
+    try:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            args = shlex.split(line)
+            if args and args[0] == "batch":
+                print("batch 안에서 batch는 실행할 수 없습니다:", line)
+                failed += 1
+                continue
+            # 한 줄이 실패해도 나머지 명령은 계속 실행한다
+            try:
+                code = run(args)
+            except Exception as e:
+                print(f"{line}: {type(e).__name__}: {e}", file=sys.stderr)
+                code = 1
+            if code != 0:
+                failed += 1
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    args = list(sys.argv[1:] if argv is None else argv)
+    if not args or args[0] in ("-h", "--help", "help"):
+        print(usage())
+        return 0
+    if args[0] == "batch":
+        if len(args) < 2:
+            print("Usage: python -m mde batch <commands.txt|->")
+            return 2
+        return run_batch(args[1])
+    return run(args)
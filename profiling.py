@@ -0,0 +1,255 @@
+"""Stage timing and counters shared by the analysis tools.
+
+Profiling is off by default. It is turned on by passing ``--profile`` (or
+``--profile=<report.json>``) to a tool whose ``main`` calls
+``enable_from_argv()``, or by setting ``MDE_PROFILE=1`` / ``MDE_PROFILE=<path>``.
+When it is off, ``span()`` returns a shared no-op context manager and
+``count()`` returns immediately, so instrumented code pays one function call.
+
+The report is written at exit as JSON (spans, counters, max RSS) plus a
+``.folded`` file in the collapsed-stack format read by flamegraph.pl and
+speedscope. Allocation tracing with tracemalloc slows allocation-heavy
+parsing several times over and skews the timings, so the traced peak is only
+measured with ``--profile-memory`` (or ``MDE_PROFILE_MEMORY=1``).
+"""
+import atexit
+import os
+import sys
+import threading
+import time
+from functools import wraps
+
+ENV_VAR = "MDE_PROFILE"
+MEMORY_ENV_VAR = "MDE_PROFILE_MEMORY"
+CO_GENERATOR = 0x20       # inspect.CO_GENERATOR (inspect는 import 비용이 커서 쓰지 않는다)
+DEFAULT_REPORT = "profile.json"
+
+_enabled = False
+_output = None
+_local = threading.local()
+_lock = threading.Lock()
+_spans = {}      # ("load", "parse_kml") -> [호출 수, 누적 시간(s)]
+_counters = {}
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = _local.stack
+        key = tuple(stack)
+        stack.pop()
+        with _lock:
+            rec = _spans.get(key)
+            if rec is None:
+                rec = _spans[key] = [0, 0.0]
+            rec[0] += 1
+            rec[1] += elapsed
+        return False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def span(name: str):
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def count(name: str, n: int = 1) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def profiled(name: str = None):
+    # 함수 전체를 하나의 span으로 측정하는 데코레이터
+    def decorator(func):
+        label = name or func.__qualname__
+
+        if func.__code__.co_flags & CO_GENERATOR:
+            # 제너레이터는 next() 호출마다 측정해 소비하는 쪽의 시간은 빼고 잰다
+            @wraps(func)
+            def gen_wrapper(*args, **kwargs):
+                items = func(*args, **kwargs)
+                return _timed_iter(label, items) if _enabled else items
+            return gen_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _timed_iter(label, items):
+    while True:
+        with _Span(label):
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+        yield item
+
+
+def enable(output: str = None, memory: bool = False) -> None:
+    global _enabled, _output
+    _output = output or _output or DEFAULT_REPORT
+    if memory:
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    if _enabled:
+        return
+    _enabled = True
+    atexit.register(write_report)
+
+
+def enable_from_argv(argv=None) -> None:
+    """Strip ``--profile[=path]`` / ``--profile-memory`` from ``argv`` and enable.
+
+    ``argv`` defaults to ``sys.argv``. ``--profile-memory`` implies ``--profile``.
+    """
+    argv = sys.argv if argv is None else argv
+    memory = "--profile-memory" in argv
+    if memory:
+        argv.remove("--profile-memory")
+    for i, arg in enumerate(argv):
+        if arg == "--profile" or arg.startswith("--profile="):
+            del argv[i]
+            enable(arg.partition("=")[2] or None, memory)
+            return
+    if memory:
+        enable(None, memory)
+
+
+def report() -> dict:
+    spans = []
+    with _lock:
+        items = sorted(_spans.items())
+        counters = dict(_counters)
+    for key, (calls, total) in items:
+        spans.append({"path": "/".join(key), "name": key[-1], "calls": calls, "total_s": round(total, 6)})
+    peak = None
+    if "tracemalloc" in sys.modules and sys.modules["tracemalloc"].is_tracing():
+        peak = sys.modules["tracemalloc"].get_traced_memory()[1]
+    return {
+        "argv": sys.argv,
+        "spans": spans,
+        "counters": counters,
+        "peak_traced_bytes": peak,
+        "max_rss_kb": _max_rss_kb(),
+    }
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {"spans": {key: tuple(rec) for key, rec in _spans.items()}, "counters": dict(_counters)}
+
+
+def call_collected(enabled: bool, func, *args, **kwargs):
+    """Run ``func`` in a worker process; return ``(result, snapshot)``.
+
+    ``enabled`` is the parent's ``is_enabled()``. The snapshot holds only the
+    spans and counters of this call (None when profiling is off) and is
+    added to the parent's report with ``merge()``. Not for use in the parent
+    process, whose data it clears.
+    """
+    global _enabled
+    if not enabled:
+        return func(*args, **kwargs), None
+    # spawn으로 시작한 worker는 설정을, fork로 시작한 worker는 부모의 기록을 물려받는다
+    _enabled = True
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+    _local.stack = []
+    result = func(*args, **kwargs)
+    return result, snapshot()
+
+
+def merge(snap) -> None:
+    # worker에서 잰 span은 지금 열려 있는 span 아래에 붙인다
+    if not snap or not _enabled:
+        return
+    prefix = tuple(getattr(_local, "stack", None) or ())
+    with _lock:
+        for key, (calls, total) in snap["spans"].items():
+            rec = _spans.get(prefix + key)
+            if rec is None:
+                rec = _spans[prefix + key] = [0, 0.0]
+            rec[0] += calls
+            rec[1] += total
+        for name, n in snap["counters"].items():
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def _max_rss_kb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def folded_stacks() -> list:
+    # collapsed stack 형식은 자기 시간(self time)을 쓰므로 자식 span 시간을 뺀다
+    with _lock:
+        totals = {key: rec[1] for key, rec in _spans.items()}
+    self_time = dict(totals)
+    for key, total in totals.items():
+        if len(key) > 1 and key[:-1] in self_time:
+            self_time[key[:-1]] -= total
+    lines = []
+    for key in sorted(self_time):
+        micros = int(max(self_time[key], 0.0) * 1e6)
+        if micros:
+            lines.append(f"{';'.join(key)} {micros}")
+    return lines
+
+
+def write_report(path: str = None) -> str:
+    import json
+
+    path = path or _output or DEFAULT_REPORT
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report(), f, ensure_ascii=False, indent=2)
+    with open(os.path.splitext(path)[0] + ".folded", "w", encoding="utf-8") as f:
+        f.write("\n".join(folded_stacks()) + "\n")
+    return path
+
+
+_env = os.environ.get(ENV_VAR, "")
+_env_memory = os.environ.get(MEMORY_ENV_VAR, "") not in ("", "0")
+if (_env and _env != "0") or _env_memory:
+    enable(None if _env in ("", "0", "1") else _env, _env_memory)
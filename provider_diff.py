@@ -0,0 +1,294 @@
+import csv
+import sys
+from datetime import datetime, timedelta
+from math import cos, radians
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import profiling
+from Tag_Tracking_Check.route_stops import haversine
+from tracking_log import KST, iter_gnss_epochs, iter_tracking_fixes
+
+DEFAULT_STEP = 1.0        # 공통 시간 격자 간격 (s)
+DEFAULT_MAX_GAP = 10.0    # 이보다 멀리 떨어진 두 점 사이는 보간하지 않는다 (s)
+DEFAULT_BUCKET = 300      # 시간대별 요약 단위 (s)
+DEFAULT_CHUNK = 3600      # 한 번에 처리하는 격자 epoch 수
+DEFAULT_RADIUS = 300      # 장소 방문 판정 반경 (m)
+HIST_BIN = 1.0            # 백분위 계산용 히스토그램 폭 (m)
+
+DEFAULT_STREAMS = ("fused", "network", "gnss")
+
+
+def stream_positions(path: str, name: str) -> Iterator[Tuple]:
+    # "gnss"는 $GNRMC/$GNGGA, 나머지는 #location의 provider 이름
+    if name == "gnss":
+        items = ((e["time"], e["lat"], e["lon"]) for e in iter_gnss_epochs(path))
+    else:
+        items = ((f["time"], f["lat"], f["lon"]) for f in iter_tracking_fixes(path) if f["provider"] == name)
+    # StreamCursor는 시간순을 가정하므로 이전 fix보다 늦지 않은 fix는 버린다
+    last = None
+    dropped = 0
+    for item in items:
+        if last is not None and item[0] <= last:
+            dropped += 1
+            continue
+        last = item[0]
+        yield item
+    profiling.count("diff.out_of_order_fixes", dropped)
+
+
+class StreamCursor:
+    """Forward-only linear interpolation over one time-sorted position stream.
+
+    Only the two fixes around the current grid time are kept, so memory does
+    not grow with the length of the log.
+    """
+
+    def __init__(self, positions: Iterable[Tuple], max_gap: float = DEFAULT_MAX_GAP):
+        self._it = iter(positions)
+        self.max_gap = max_gap
+        self.prev = None
+        self.next = next(self._it, None)
+        self.exhausted = self.next is None
+
+    def start(self):
+        return self.next[0] if self.next is not None else None
+
+    def at(self, t) -> Optional[Tuple[float, float]]:
+        while self.next is not None and self.next[0] <= t:
+            self.prev = self.next
+            self.next = next(self._it, None)
+        if self.next is None:
+            self.exhausted = True
+        p, n = self.prev, self.next
+        if p is None:
+            return None
+        if p[0] == t:
+            return p[1], p[2]
+        if n is None:
+            return None
+        span = (n[0] - p[0]).total_seconds()
+        if span <= 0 or span > self.max_gap:
+            return None
+        w = (t - p[0]).total_seconds() / span
+        return p[1] + (n[1] - p[1]) * w, p[2] + (n[2] - p[2]) * w
+
+
+class DiffStats:
+    # 거리와 동/북 방향 편향의 누적 통계 (원본 값은 보관하지 않는다)
+
+    def __init__(self):
+        self.n = 0
+        self.sum_d = 0.0
+        self.sum_d2 = 0.0
+        self.max_d = 0.0
+        self.sum_east = 0.0
+        self.sum_north = 0.0
+        self.hist = {}
+
+    def add(self, d: float, east: float, north: float) -> None:
+        self.n += 1
+        self.sum_d += d
+        self.sum_d2 += d * d
+        self.max_d = max(self.max_d, d)
+        self.sum_east += east
+        self.sum_north += north
+        b = int(d / HIST_BIN)
+        self.hist[b] = self.hist.get(b, 0) + 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.n:
+            return None
+        target = self.n * q / 100
+        seen = 0
+        for b in sorted(self.hist):
+            seen += self.hist[b]
+            if seen >= target:
+                # 구간 상한을 쓰므로 실제 최댓값을 넘지 않게 자른다
+                return min((b + 1) * HIST_BIN, self.max_d)
+        return self.max_d
+
+    def summary(self) -> Dict:
+        if not self.n:
+            return {"n": 0}
+        return {
+            "n": self.n,
+            "mean": self.sum_d / self.n,
+            "rms": (self.sum_d2 / self.n) ** 0.5,
+            "p95": self.percentile(95),
+            "max": self.max_d,
+            "bias_east": self.sum_east / self.n,
+            "bias_north": self.sum_north / self.n,
+        }
+
+
+def _offset(lat1, lon1, lat2, lon2):
+    # (lat1, lon1)에서 본 (lat2, lon2)의 동/북 방향 변위 (m)
+    k = radians(1) * 6371e3
+    return (lon2 - lon1) * k * cos(radians(lat1)), (lat2 - lat1) * k
+
+
+def _nearest_stop(entries, lat, lon, radius):
+    for order, e in enumerate(entries, 1):
+        if haversine(lon, lat, e["lon"], e["lat"]) <= radius:
+            return order
+    return None
+
+
+@profiling.profiled("diff_streams")
+def diff_streams(streams: Dict[str, Iterable[Tuple]], step: float = DEFAULT_STEP,
+                 max_gap: float = DEFAULT_MAX_GAP, bucket: int = DEFAULT_BUCKET,
+                 chunk: int = DEFAULT_CHUNK, entries: Optional[List[Dict]] = None,
+                 radius: float = DEFAULT_RADIUS, epoch_writer=None) -> Dict:
+    """Resample position streams onto one time grid and difference every pair.
+
+    ``streams`` maps a name to a time-sorted iterable of ``(dt, lat, lon)``.
+    The grid runs from the earliest stream start in ``step`` second epochs and
+    is processed ``chunk`` epochs at a time. The result holds ``DiffStats``
+    per pair overall, per time bucket and, when route ``entries`` are given,
+    per stop visit keyed by ``(order, visit number)``; a visit starts when the
+    first stream enters a stop's radius and ends when it leaves. Rows of
+    ``(time, pair, distance, east, north)`` go to ``epoch_writer`` if given.
+    """
+    names = list(streams)
+    cursors = {name: StreamCursor(streams[name], max_gap) for name in names}
+    pairs = [(a, b) for i, a in enumerate(names) for b in names[i + 1:]]
+    result = {
+        "overall": {pair: DiffStats() for pair in pairs},
+        "buckets": {},
+        "stops": {},
+    }
+    starts = [c.start() for c in cursors.values() if c.start() is not None]
+    if len(starts) < 2:
+        return result
+
+    step_td = timedelta(seconds=step)
+    # 가장 먼저 시작한 스트림부터 격자를 만든다; 데이터가 없는 쪽이 있는 epoch는 _accumulate에서 건너뛴다
+    t = min(starts)
+    ref = names[0]
+    visits = {"current": None, "counts": {}}
+    epochs = 0
+    while sum(1 for c in cursors.values() if not c.exhausted) >= 2:
+        # 한 chunk 분량의 격자 시각과 스트림별 보간 위치를 열 단위로 만든다
+        times = [t + step_td * k for k in range(chunk)]
+        t = times[-1] + step_td
+        columns = {name: [cursors[name].at(ti) for ti in times] for name in names}
+        epochs += len(times)
+        with profiling.span("diff_chunk"):
+            _accumulate(result, pairs, times, columns, ref, bucket, entries, radius, visits, epoch_writer)
+    profiling.count("grid_epochs", epochs)
+    return result
+
+
+def _visit_keys(positions, entries, radius, visits):
+    # 기준 스트림이 장소 반경에 들어올 때마다 방문 번호를 올린다 (위치가 없는 epoch는 상태 유지)
+    keys = []
+    counts = visits["counts"]
+    for p in positions:
+        if p is None:
+            keys.append(None)
+            continue
+        order = _nearest_stop(entries, p[0], p[1], radius)
+        if order != visits["current"]:
+            visits["current"] = order
+            if order is not None:
+                counts[order] = counts.get(order, 0) + 1
+        keys.append((order, counts[order]) if order is not None else None)
+    return keys
+
+
+def _accumulate(result, pairs, times, columns, ref, bucket, entries, radius, visits, epoch_writer):
+    overall = result["overall"]
+    buckets = result["buckets"]
+    stops = result["stops"]
+    # 기준 스트림 위치로 epoch마다 방문 중인 장소를 한 번만 판정한다
+    if entries:
+        visit = _visit_keys(columns[ref], entries, radius, visits)
+    else:
+        visit = [None] * len(times)
+    for a, b in pairs:
+        for ti, pa, pb, order in zip(times, columns[a], columns[b], visit):
+            if pa is None or pb is None:
+                continue
+            d = haversine(pa[1], pa[0], pb[1], pb[0])
+            east, north = _offset(pa[0], pa[1], pb[0], pb[1])
+            overall[(a, b)].add(d, east, north)
+            key = int(ti.timestamp()) // bucket * bucket
+            buckets.setdefault(key, {}).setdefault((a, b), DiffStats()).add(d, east, north)
+            if order is not None:
+                stops.setdefault(order, {}).setdefault((a, b), DiffStats()).add(d, east, north)
+            if epoch_writer is not None:
+                epoch_writer.writerow([ti.isoformat(), f"{a}-{b}", f"{d:.2f}", f"{east:.2f}", f"{north:.2f}"])
+
+
+def _format(s: Dict) -> str:
+    if not s["n"]:
+        return "n=0"
+    return (f"n={s['n']} mean {s['mean']:.1f} rms {s['rms']:.1f} p95 {s['p95']:.0f} "
+            f"max {s['max']:.1f} bias E {s['bias_east']:+.1f} N {s['bias_north']:+.1f} (m)")
+
+
+def main():
+    profiling.enable_from_argv()
+    args = sys.argv[1:]
+    options = {}
+    names = DEFAULT_STREAMS
+    epochs_csv = None
+    route = None
+    flags = {"--step": float, "--bucket": int, "--max-gap": float}
+    for flag, conv in flags.items():
+        if flag in args:
+            i = args.index(flag)
+            options[flag[2:].replace("-", "_")] = conv(args[i + 1])
+            del args[i:i + 2]
+    if "--streams" in args:
+        i = args.index("--streams")
+        names = tuple(n for n in args[i + 1].split(",") if n)
+        del args[i:i + 2]
+    if "--epochs" in args:
+        i = args.index("--epochs")
+        epochs_csv = args[i + 1]
+        del args[i:i + 2]
+    if "--route" in args:
+        i = args.index("--route")
+        route = args[i + 1]
+        del args[i:i + 2]
+    if not args:
+        print("Usage: python provider_diff.py <TRACKING.txt> [--streams fused,network,gnss] [--step 1] "
+              "[--bucket 300] [--max-gap 10] [--route 이동경로.txt] [--epochs out.csv]")
+        return
+
+    path = args[0]
+    entries = None
+    if route:
+        from Tag_Tracking_Check.route_stops import parse_path_txt
+        entries = parse_path_txt(route)
+
+    streams = {name: stream_positions(path, name) for name in names}
+    out = open(epochs_csv, "w", encoding="utf-8", newline="") if epochs_csv else None
+    try:
+        writer = csv.writer(out) if out else None
+        if writer:
+            writer.writerow(["time", "pair", "distance", "east", "north"])
+        result = diff_streams(streams, entries=entries, epoch_writer=writer, **options)
+    finally:
+        if out:
+            out.close()
+
+    print("=== 전체 ===")
+    for (a, b), stats in result["overall"].items():
+        print(f"{a} vs {b}: {_format(stats.summary())}")
+    if entries:
+        print("\n=== 장소 방문별 ===")
+        for order, n in sorted(result["stops"]):
+            print(f"[{order}] {entries[order - 1]['place']} ({n}번째 방문)")
+            for (a, b), stats in result["stops"][(order, n)].items():
+                print(f"  {a} vs {b}: {_format(stats.summary())}")
+    print("\n=== 시간대별 ===")
+    for key in sorted(result["buckets"]):
+        label = datetime.fromtimestamp(key, tz=KST).strftime("%H:%M")
+        for (a, b), stats in result["buckets"][key].items():
+            print(f"{label} {a} vs {b}: {_format(stats.summary())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import csv
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+
+import profiling
+from Tag_Tracking_Check.route_stops import haversine
+
+NS = {"kml": "http://www.opengis.net/kml/2.2"}
+
+
+def parse_path_txt(path):
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) < 6:
+                continue
+            order = int(row[0])
+            place = row[1]
+            lon = float(row[2])
+            lat = float(row[3])
+            arrive = row[4].replace('.', ':').strip()
+            if arrive == "-" or not arrive:
+                continue
+            depart = row[5].replace('.', ':').strip()
+            entries.append({
+                "order": order,
+                "place": place,
+                "lon": lon,
+                "lat": lat,
+                "arrive": arrive,
+                "depart": depart,
+            })
+    return entries
+
+
+def placemark_point(pm):
+    # (KST 시각, lat, lon); GUI의 KmlTail도 이 함수를 써서 CLI와 결과가 같다
+    time_elem = pm.find(".//kml:when", NS)
+    coord_elem = pm.find(".//kml:Point/kml:coordinates", NS)
+    if time_elem is None or coord_elem is None:
+        return None
+    coord_text = coord_elem.text.strip().split()[0]
+    lon, lat = map(float, coord_text.split(",")[:2])
+    t = datetime.strptime(time_elem.text, "%Y-%m-%dT%H:%M:%SZ") + timedelta(hours=9)
+    return t, lat, lon
+
+
+def kml_points(positions):
+    return [{"time": t, "lon": lon, "lat": lat} for t, lat, lon in positions]
+
+
+@profiling.profiled("parse_kml")
+def parse_kml(path):
+    with profiling.span("xml_parse"):
+        tree = ET.parse(path)
+    placemarks = tree.getroot().findall(".//kml:Placemark", NS)
+    profiling.count("kml.placemarks", len(placemarks))
+    points = (placemark_point(pm) for pm in placemarks)
+    return kml_points(p for p in points if p is not None)
+
+
+@profiling.profiled("find_nearest")
+def find_nearest(lon, lat, points):
+    profiling.count("distance_evaluations", len(points))
+    min_dist = None
+    nearest_time = None
+    nearest_point = None
+    for p in points:
+        d = haversine(lon, lat, p["lon"], p["lat"])
+        if min_dist is None or d < min_dist:
+            min_dist = d
+            nearest_time = p["time"]
+            nearest_point = (p["lon"], p["lat"])
+    return min_dist, nearest_time, nearest_point
+
+
+def compare_rows(path_entries, kml_points):
+    # 장소마다 (entry, 거리, 시각, 위치); 점이 없으면 거리/시각/위치는 None
+    rows = []
+    for entry in path_entries:
+        dist, t, pos = find_nearest(entry["lon"], entry["lat"], kml_points)
+        rows.append((entry, dist, t, pos))
+    return rows
+
+
+def main():
+    profiling.enable_from_argv()
+    if len(sys.argv) < 3:
+        print("Usage: python -m mde route compare <이동경로.txt> <Tracking.kml>")
+        return
+    path_entries = parse_path_txt(sys.argv[1])
+    kml_points = parse_kml(sys.argv[2])
+    for entry, dist, t, pos in compare_rows(path_entries, kml_points):
+        if t is None:
+            continue
+        print(entry["place"], entry["arrive"], f"{pos[1]:.6f}, {pos[0]:.6f}", t.strftime("%H:%M:%S"), f"{dist:.1f}")
+
+
+if __name__ == "__main__":
+    main()
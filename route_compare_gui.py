@@ -1,79 +1,12 @@
-import csv
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import xml.etree.ElementTree as ET
-from math import radians, cos, sin, asin, sqrt
-from datetime import datetime, timedelta
 import webbrowser
 
+import profiling
 import show_kml_path
-
-
-def parse_path_txt(path):
-    entries = []
-    with open(path, encoding="utf-8") as f:
-        reader = csv.reader(f)
-        next(reader, None)
-        for row in reader:
-            if len(row) < 6:
-                continue
-            order = int(row[0])
-            place = row[1]
-            lon = float(row[2])
-            lat = float(row[3])
-            arrive = row[4].replace('.', ':').strip()
-            if arrive == "-" or not arrive:
-                continue
-            depart = row[5].replace('.', ':').strip()
-            entries.append({
-                "order": order,
-                "place": place,
-                "lon": lon,
-                "lat": lat,
-                "arrive": arrive,
-                "depart": depart,
-            })
-    return entries
-
-
-def parse_kml(path):
-    ns = {"kml": "http://www.opengis.net/kml/2.2"}
-    tree = ET.parse(path)
-    root = tree.getroot()
-    points = []
-    for pm in root.findall(".//kml:Placemark", ns):
-        time_elem = pm.find(".//kml:when", ns)
-        coord_elem = pm.find(".//kml:Point/kml:coordinates", ns)
-        if time_elem is not None and coord_elem is not None:
-            coord_text = coord_elem.text.strip().split()[0]
-            lon, lat = map(float, coord_text.split(",")[:2])
-            t = datetime.strptime(time_elem.text, "%Y-%m-%dT%H:%M:%SZ") + timedelta(hours=9)
-            points.append({"time": t, "lon": lon, "lat": lat})
-    return points
-
-
-def haversine(lon1, lat1, lon2, lat2):
-    R = 6371e3
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-    c = 2 * asin(sqrt(a))
-    return R * c
-
-
-def find_nearest(lon, lat, points):
-    min_dist = None
-    nearest_time = None
-    nearest_point = None
-    for p in points:
-        d = haversine(lon, lat, p["lon"], p["lat"])
-        if min_dist is None or d < min_dist:
-            min_dist = d
-            nearest_time = p["time"]
-            nearest_point = (p["lon"], p["lat"])
-    return min_dist, nearest_time, nearest_point
+from route_compare import parse_path_txt, placemark_point, kml_points, compare_rows
+from Tag_Tracking_Check.list_kml_positions import KmlTail
 
 
 class RouteCompareGUI(tk.Tk):
@@ -126,45 +59,75 @@ class RouteCompareGUI(tk.Tk):
         if not txt or not kml:
             messagebox.showerror("오류", "파일을 선택하세요")
             return
+        # 같은 파일로 다시 비교하면 그 사이에 추가된 Placemark만 읽는다
+        state = getattr(self, "_state", None)
         try:
-            path_entries = parse_path_txt(txt)
-            kml_points = parse_kml(kml)
+            if state is None or state["key"] != (txt, kml):
+                for i in self.tree.get_children():
+                    self.tree.delete(i)
+                path_entries = parse_path_txt(txt)
+                state = {
+                    "key": (txt, kml),
+                    "tail": KmlTail(kml, position=placemark_point),
+                    "entries": path_entries,
+                    "nearest": [(None, None, None)] * len(path_entries),
+                }
+            new_positions, reset = state["tail"].read_new()
         except Exception as e:
+            self._state = None
             messagebox.showerror("오류", str(e))
             return
-
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
-        for entry in path_entries:
-            dist, t, pos = find_nearest(entry["lon"], entry["lat"], kml_points)
-            if t is None:
+        self._state = state
+        errors = state["tail"].errors
+        if errors and errors != state.get("reported_errors", 0):
+            messagebox.showwarning("경고", f"파싱하지 못한 Placemark {errors}개를 건너뛰었습니다")
+        state["reported_errors"] = errors
+        if reset:
+            # 파일이 교체되었으면 이전 파일 기준의 행을 모두 지운다
+            for i in self.tree.get_children():
+                self.tree.delete(i)
+            state["nearest"] = [(None, None, None)] * len(state["entries"])
+
+        with profiling.span("compare"):
+            self._update_tree(state, kml_points(new_positions))
+
+    def _update_tree(self, state, points):
+        rows = compare_rows(state["entries"], points)
+        for idx, (entry, dist, t, pos) in enumerate(rows):
+            best = state["nearest"][idx]
+            if t is None or (best[0] is not None and dist >= best[0]):
                 continue
+            state["nearest"][idx] = (dist, t, pos)
             track_pos = f"{pos[1]:.6f}, {pos[0]:.6f}"
-            self.tree.insert(
-                "",
-                tk.END,
-                values=[
-                    entry["place"],
-                    entry["arrive"],
-                    track_pos,
-                    t.strftime("%H:%M:%S"),
-                    f"{dist:.1f}",
-                ],
-            )
+            values = [
+                entry["place"],
+                entry["arrive"],
+                track_pos,
+                t.strftime("%H:%M:%S"),
+                f"{dist:.1f}",
+            ]
+            iid = str(idx)
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=values)
+            else:
+                # 경로 순서를 유지하도록 앞쪽 행 개수 위치에 넣는다
+                pos_index = sum(1 for k in range(idx) if self.tree.exists(str(k)))
+                self.tree.insert("", pos_index, iid=iid, values=values)
 
     def show_map(self):
         kml = self.kml_var.get()
         if not kml:
             messagebox.showerror("오류", "KML 파일을 선택하세요")
             return
-        coords = show_kml_path.parse_kml(kml)
-        out_file = os.path.abspath("path.html")
-        show_kml_path.generate_html(coords, out_file)
+        with profiling.span("show_map"):
+            coords = show_kml_path.parse_kml(kml)
+            out_file = os.path.abspath("path.html")
+            show_kml_path.generate_html(coords, out_file)
         webbrowser.open(f"file://{out_file}")
 
 
 def main():
+    profiling.enable_from_argv()
     app = RouteCompareGUI()
     app.mainloop()
 
@@ -1,6 +1,8 @@
 import sys
 import xml.etree.ElementTree as ET
 
+import profiling
+
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html>
 <head>
@@ -32,6 +34,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 </html>"""
 
 
+@profiling.profiled('parse_course')
 def parse_kml(filename):
     ns = {
         'kml': 'http://www.opengis.net/kml/2.2',
@@ -63,6 +66,7 @@ def generate_html(coords, out_file='path.html'):
 
 
 def main():
+    profiling.enable_from_argv()
     if len(sys.argv) < 2:
         print('Usage: python show_kml_path.py path_to_file.kml')
         return
@@ -0,0 +1,227 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+import profiling
+
+KST = timezone(timedelta(hours=9))
+MARK_BYTES = 256       # TrackingTail이 파일 교체 판별에 쓰는 offset 앞 바이트 수
+
+# TRACKING-*.txt 로그 형식 (AngryGPS)
+#   AccInfo:<TAB><epoch ms><TAB>:<TAB><accuracy><TAB>Speed:<TAB><km/h>
+#   #location,HHMMSS,lat,lon,speed(m/s),bearing,DDMMYY,provider,accuracy,...
+#   $GNRMC / $GNGGA NMEA 문장 (UTC)
+
+
+def _float(text: str) -> Optional[float]:
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _utc_time(hhmmss: str, ddmmyy: str) -> Optional[datetime]:
+    try:
+        dt = datetime.strptime(ddmmyy + hhmmss[:6], "%d%m%y%H%M%S")
+    except ValueError:
+        return None
+    frac = hhmmss[7:]
+    if frac.isdigit():
+        dt = dt.replace(microsecond=int(frac[:6].ljust(6, "0")))
+    return dt.replace(tzinfo=timezone.utc)
+
+
+def parse_acc_info(line: str) -> Optional[Dict]:
+    parts = line.split()
+    # ['AccInfo:', '1748319142197', ':', '68.4', 'Speed:', '0.00']
+    if len(parts) < 6:
+        return None
+    try:
+        epoch_ms = int(parts[1])
+    except ValueError:
+        return None
+    return {
+        "epoch_ms": epoch_ms,
+        "accuracy": _float(parts[3]),
+        "speed_kmh": _float(parts[5]),
+    }
+
+
+def parse_location_line(line: str, acc_info: Optional[Dict] = None) -> Optional[Dict]:
+    parts = line.rstrip().split(",")
+    if len(parts) < 9:
+        return None
+    lat = _float(parts[2])
+    lon = _float(parts[3])
+    if lat is None or lon is None:
+        return None
+    # AccInfo 줄의 epoch(ms)가 있으면 초 단위 HHMMSS보다 정밀하므로 우선 사용
+    if acc_info is not None:
+        dt = datetime.fromtimestamp(acc_info["epoch_ms"] / 1000, tz=timezone.utc)
+    else:
+        dt = _utc_time(parts[1], parts[6])
+    if dt is None:
+        return None
+    return {
+        "time": dt.astimezone(KST),
+        "lat": lat,
+        "lon": lon,
+        "speed": _float(parts[4]),
+        "bearing": _float(parts[5]),
+        "provider": parts[7],
+        "accuracy": _float(parts[8]),
+        "acc_info": acc_info["accuracy"] if acc_info else None,
+    }
+
+
+@profiling.profiled("iter_tracking_fixes")
+def iter_tracking_fixes(path: str) -> Iterator[Dict]:
+    acc_info = None
+    lineno = fixes = 0
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for lineno, line in enumerate(f, 1):
+                if line.startswith("AccInfo:"):
+                    acc_info = parse_acc_info(line)
+                elif line.startswith("#location"):
+                    fix = parse_location_line(line, acc_info)
+                    acc_info = None
+                    if fix is not None:
+                        fixes += 1
+                        yield fix
+    finally:
+        profiling.count("tracking.lines_scanned", lineno)
+        profiling.count("tracking.fixes", fixes)
+
+
+class TrackingTail:
+    """Parse only the #location fixes appended since the last read.
+
+    The byte offset after the last complete line and a pending AccInfo line
+    are carried between calls. ``reset`` is True when the file was replaced
+    by a new log and was read again from the start: it shrank, its inode
+    changed, or the bytes just before the offset differ.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self._acc_info = None
+        self._ino = None
+        self._mark = b""
+
+    def _replaced(self, f) -> bool:
+        st = os.fstat(f.fileno())
+        if st.st_size < self.offset or st.st_ino != self._ino:
+            return True
+        f.seek(self.offset - len(self._mark))
+        return f.read(len(self._mark)) != self._mark
+
+    def read_new(self):
+        with open(self.path, "rb") as f:
+            reset = self.offset > 0 and self._replaced(f)
+            if reset:
+                self.offset = 0
+                self._acc_info = None
+                self._mark = b""
+            self._ino = os.fstat(f.fileno()).st_ino
+            f.seek(self.offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+        # 파일 교체 판별용으로 offset 바로 앞의 바이트를 기억한다
+        self._mark = (self._mark + data[:end])[-MARK_BYTES:]
+        fixes = []
+        for line in data[:end].decode("utf-8", errors="ignore").splitlines():
+            if line.startswith("AccInfo:"):
+                self._acc_info = parse_acc_info(line)
+            elif line.startswith("#location"):
+                fix = parse_location_line(line, self._acc_info)
+                self._acc_info = None
+                if fix is not None:
+                    fixes.append(fix)
+        profiling.count("tracking.fixes", len(fixes))
+        return fixes, reset
+
+
+@profiling.profiled("parse_tracking_log")
+def parse_tracking_log(path: str) -> List[Dict]:
+    return list(iter_tracking_fixes(path))
+
+
+def _nmea_coord(value: str, hemi: str) -> Optional[float]:
+    # ddmm.mmmm / dddmm.mmmm -> 십진 도
+    if not value or "." not in value:
+        return None
+    head = value.index(".") - 2
+    try:
+        deg = float(value[:head]) + float(value[head:]) / 60
+    except ValueError:
+        return None
+    return -deg if hemi in ("S", "W") else deg
+
+
+def iter_gnss_epochs(path: str) -> Iterator[Dict]:
+    # $GNGGA에는 날짜가 없으므로 바로 앞의 같은 시각 $GNRMC와 묶어 하나의 epoch로 만든다
+    current = None
+    current_key = None
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            if line.startswith("$GNRMC"):
+                if current is not None:
+                    yield current
+                current = current_key = None
+                p = line.split("*")[0].split(",")
+                if len(p) < 10 or p[2] != "A":
+                    continue
+                lat = _nmea_coord(p[3], p[4])
+                lon = _nmea_coord(p[5], p[6])
+                dt = _utc_time(p[1], p[9])
+                if lat is None or lon is None or dt is None:
+                    continue
+                knots = _float(p[7]) if p[7] else None
+                current_key = p[1]
+                current = {
+                    "time": dt.astimezone(KST),
+                    "lat": lat,
+                    "lon": lon,
+                    "speed": knots * 0.514444 if knots is not None else None,
+                    "bearing": _float(p[8]) if p[8] else None,
+                    "quality": None,
+                    "satellites": None,
+                    "hdop": None,
+                    "altitude": None,
+                }
+            elif line.startswith("$GNGGA") and current is not None:
+                p = line.split("*")[0].split(",")
+                if len(p) < 10 or p[1] != current_key:
+                    continue
+                current.update({
+                    "quality": int(p[6]) if p[6].isdigit() else None,
+                    "satellites": int(p[7]) if p[7].isdigit() else None,
+                    "hdop": _float(p[8]) if p[8] else None,
+                    "altitude": _float(p[9]) if p[9] else None,
+                })
+    if current is not None:
+        yield current
+
+
+def main():
+    profiling.enable_from_argv()
+    if len(sys.argv) < 2:
+        print("Usage: python tracking_log.py <TRACKING.txt> [--gnss]")
+        return
+    path = sys.argv[1]
+    if "--gnss" in sys.argv[2:]:
+        for e in iter_gnss_epochs(path):
+            print(e["time"].strftime("%Y-%m-%d %H:%M:%S"), f"{e['lat']:.6f}", f"{e['lon']:.6f}",
+                  e["satellites"])
+        return
+    for fix in iter_tracking_fixes(path):
+        print(fix["time"].strftime("%Y-%m-%d %H:%M:%S"), f"{fix['lat']:.6f}", f"{fix['lon']:.6f}",
+              fix["provider"], fix["accuracy"])
+
+
+if __name__ == "__main__":
+    main()
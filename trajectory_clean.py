@@ -0,0 +1,223 @@
+import sys
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import profiling
+from Tag_Tracking_Check.route_stops import haversine
+
+CHUNK_SIZE = 4096
+
+# 기본 규칙 값
+DEFAULT_PROVIDERS = ("fused",)
+DEFAULT_MAX_ACCURACY = 50.0   # m
+DEFAULT_MAX_SPEED = 55.0      # m/s (약 200 km/h)
+DEFAULT_MAX_REJECTS = 5       # 연속으로 이만큼 버리면 기준점을 다시 잡는다
+
+RULES = ("provider", "accuracy", "speed")
+
+
+def fixes_to_columns(fixes: Iterable) -> Dict[str, list]:
+    """Turn fix dicts (``tracking_log``) or ``(dt, lat, lon)`` tuples into columns.
+
+    Columns missing from the source (provider/accuracy for KML tracks) are
+    filled with None, which every rule treats as "no information, keep".
+    """
+    cols = {"time": [], "lat": [], "lon": [], "provider": [], "accuracy": []}
+    for fix in fixes:
+        if isinstance(fix, dict):
+            cols["time"].append(fix["time"])
+            cols["lat"].append(fix["lat"])
+            cols["lon"].append(fix["lon"])
+            cols["provider"].append(fix.get("provider"))
+            acc = [a for a in (fix.get("accuracy"), fix.get("acc_info")) if a is not None]
+            cols["accuracy"].append(max(acc) if acc else None)
+        else:
+            dt, lat, lon = fix[:3]
+            cols["time"].append(dt)
+            cols["lat"].append(lat)
+            cols["lon"].append(lon)
+            cols["provider"].append(None)
+            cols["accuracy"].append(None)
+    return cols
+
+
+def take(cols: Dict[str, list], mask: List[bool]) -> Dict[str, list]:
+    return {name: [v for v, keep in zip(values, mask) if keep] for name, values in cols.items()}
+
+
+def provider_mask(cols: Dict[str, list], providers) -> List[bool]:
+    if not providers:
+        return [True] * len(cols["time"])
+    allowed = set(providers)
+    return [p is None or p in allowed for p in cols["provider"]]
+
+
+def accuracy_mask(cols: Dict[str, list], max_accuracy: Optional[float]) -> List[bool]:
+    if max_accuracy is None:
+        return [True] * len(cols["time"])
+    return [a is None or a <= max_accuracy for a in cols["accuracy"]]
+
+
+def to_positions(cols: Dict[str, list]) -> List[Tuple]:
+    return list(zip(cols["time"], cols["lat"], cols["lon"]))
+
+
+class TrajectoryCleaner:
+    """Chunked cleaning stage between parsing and stop matching.
+
+    Each chunk goes through provider selection, accuracy gating and removal
+    of implausible speed jumps; optionally lat/lon are smoothed with a
+    centered moving average of ``smooth_window`` points. State carried
+    between chunks (last accepted point, smoothing window) makes the output
+    identical to cleaning the whole track at once. ``stats`` counts the
+    points each rule removed.
+    """
+
+    def __init__(self, providers=DEFAULT_PROVIDERS, max_accuracy=DEFAULT_MAX_ACCURACY,
+                 max_speed=DEFAULT_MAX_SPEED, smooth_window=0, max_rejects=DEFAULT_MAX_REJECTS):
+        self.providers = providers
+        self.max_accuracy = max_accuracy
+        self.max_speed = max_speed
+        self.max_rejects = max_rejects
+        self.half = smooth_window // 2 if smooth_window and smooth_window > 1 else 0
+        self.stats = {"input": 0, "output": 0}
+        self.stats.update({rule: 0 for rule in RULES})
+        self._last = None
+        self._rejects = 0
+        self._window = deque()
+        self._next = 0
+
+    def _speed_mask(self, cols: Dict[str, list]) -> List[bool]:
+        # 마지막으로 채택한 점 기준 속도이므로 순차 처리가 필요하다
+        mask = []
+        last = self._last
+        for t, lat, lon in zip(cols["time"], cols["lat"], cols["lon"]):
+            if last is not None and self.max_speed is not None:
+                dt = max((t - last[0]).total_seconds(), 1.0)
+                speed = haversine(last[2], last[1], lon, lat) / dt
+                if speed > self.max_speed and self._rejects < self.max_rejects:
+                    self._rejects += 1
+                    mask.append(False)
+                    continue
+            self._rejects = 0
+            last = (t, lat, lon)
+            mask.append(True)
+        self._last = last
+        return mask
+
+    def _smooth(self, cols: Dict[str, list], final: bool) -> Dict[str, list]:
+        if not self.half:
+            return cols
+        window = self._window
+        out = {name: [] for name in cols}
+        rows = list(zip(*(cols[name] for name in cols))) if cols["time"] else []
+        names = list(cols)
+        lat_i = names.index("lat")
+        lon_i = names.index("lon")
+        for row in rows:
+            window.append(row)
+            self._emit_ready(out, names, lat_i, lon_i, final=False)
+        if final:
+            self._emit_ready(out, names, lat_i, lon_i, final=True)
+        return out
+
+    def _emit_ready(self, out, names, lat_i, lon_i, final):
+        # window 앞쪽 최대 half개는 이미 내보낸 점(이웃 평균용), self._next가 다음에 내보낼 점
+        h = self.half
+        window = self._window
+        while self._next < len(window):
+            if not final and len(window) - 1 - self._next < h:
+                return
+            c = self._next
+            pts = list(islice(window, max(0, c - h), c + h + 1))
+            row = list(window[c])
+            row[lat_i] = sum(p[lat_i] for p in pts) / len(pts)
+            row[lon_i] = sum(p[lon_i] for p in pts) / len(pts)
+            for name, value in zip(names, row):
+                out[name].append(value)
+            self._next += 1
+            if self._next > h:
+                window.popleft()
+                self._next -= 1
+
+    def feed(self, cols: Dict[str, list], final: bool = False) -> Dict[str, list]:
+        n = len(cols["time"])
+        self.stats["input"] += n
+        with profiling.span("clean_chunk"):
+            for rule, mask_fn in (
+                ("provider", lambda c: provider_mask(c, self.providers)),
+                ("accuracy", lambda c: accuracy_mask(c, self.max_accuracy)),
+                ("speed", self._speed_mask),
+            ):
+                before = len(cols["time"])
+                cols = take(cols, mask_fn(cols))
+                self.stats[rule] += before - len(cols["time"])
+            cols = self._smooth(cols, final)
+        self.stats["output"] += len(cols["time"])
+        return cols
+
+    def finish(self) -> Dict[str, list]:
+        return self.feed(fixes_to_columns([]), final=True)
+
+
+def iter_chunks(fixes: Iterable, chunk_size: int = CHUNK_SIZE):
+    it = iter(fixes)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield fixes_to_columns(chunk)
+
+
+@profiling.profiled("clean_track")
+def clean_track(fixes: Iterable, chunk_size: int = CHUNK_SIZE, **options) -> Tuple[List[Tuple], Dict[str, int]]:
+    """Clean a (possibly streamed) track and return ``(dt, lat, lon)`` positions and rule stats."""
+    cleaner = TrajectoryCleaner(**options)
+    positions = []
+    for cols in iter_chunks(fixes, chunk_size):
+        positions.extend(to_positions(cleaner.feed(cols)))
+    positions.extend(to_positions(cleaner.finish()))
+    return positions, cleaner.stats
+
+
+def format_stats(stats: Dict[str, int]) -> str:
+    removed = ", ".join(f"{rule} -{stats[rule]}" for rule in RULES)
+    return f"입력 {stats['input']} -> 출력 {stats['output']} ({removed})"
+
+
+def main():
+    profiling.enable_from_argv()
+    args = sys.argv[1:]
+    options = {}
+    flags = {
+        "--providers": ("providers", lambda v: tuple(p for p in v.split(",") if p)),
+        "--max-accuracy": ("max_accuracy", float),
+        "--max-speed": ("max_speed", float),
+        "--smooth": ("smooth_window", int),
+    }
+    for flag, (key, conv) in flags.items():
+        if flag in args:
+            i = args.index(flag)
+            options[key] = conv(args[i + 1])
+            del args[i:i + 2]
+    if not args:
+        print("Usage: python trajectory_clean.py <TRACKING.txt> [이동경로.txt] "
+              "[--providers fused,network] [--max-accuracy 50] [--max-speed 55] [--smooth 5]")
+        return
+
+    from tracking_log import iter_tracking_fixes
+
+    positions, stats = clean_track(iter_tracking_fixes(args[0]), **options)
+    print(format_stats(stats))
+
+    if len(args) > 1:
+        from Tag_Tracking_Check.route_stops import parse_path_txt, group_positions, summarize_stops, short_place
+
+        entries = parse_path_txt(args[1])
+        for row in summarize_stops(entries, group_positions(entries, positions)):
+            print(row["arrive"].strftime("%H:%M:%S"), short_place(row["place"]), row["diff"], row["result"])
+
+
+if __name__ == "__main__":
+    main()